@@ -0,0 +1,204 @@
+# ============================================================
+# BATCH COMPILER — MUITOS COMPORTAMENTOS POR REQUISIÇÃO
+# Descrições numeradas num único prompt, system prompt fixo e sem histórico
+# Validação por item, nova consulta só dos itens que falharam
+# Comparação com o laço de chat (teste.py): tokens e tempo por 1000
+# ============================================================
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from vexi_isa import parse_program, system_rules
+from vvm import validate_program
+
+BATCH_INSTRUCTIONS = (
+    "Each input line is 'N. <behavior>'. Compile every behavior independently.\n"
+    "Answer with exactly one line per item, in the form 'N: <bytecode>', "
+    "using only integers separated by spaces."
+)
+ANSWER_LINE = re.compile(r"^\s*(\d+)\s*[:.)]\s*(-?\d+(?:\s+-?\d+)*)\s*$", re.MULTILINE)
+
+
+def batch_prompt(items, rules: str) -> str:
+    """
+    `items` = [(id, descrição)]. O prefixo (regras + instruções) é igual em
+    todas as requisições, então pode ir para o cache do provedor.
+    """
+    body = "\n".join(f"{i}. {text}" for i, text in items)
+    return f"{rules}\n{BATCH_INSTRUCTIONS}\n\n{body}\n"
+
+
+def parse_batch(text: str) -> dict:
+    return {int(m.group(1)): m.group(2) for m in ANSWER_LINE.finditer(text)}
+
+
+def is_valid(bytecode) -> bool:
+    if not bytecode:
+        return False
+    try:
+        return validate_program(parse_program(bytecode)) == -1
+    except (ValueError, OverflowError):
+        return False
+
+
+@dataclass
+class BatchReport:
+    programs: dict = field(default_factory=dict)   # id -> bytecode válido
+    failed: list = field(default_factory=list)     # ids sem resultado válido
+    requests: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    wall_clock: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+
+    @property
+    def tokens_per_program(self) -> float:
+        return self.tokens / max(len(self.programs), 1)
+
+    def per_1000(self, n: int) -> float:
+        return self.wall_clock / n * 1000
+
+    def summary(self, name: str, n: int) -> str:
+        return (f"{name:<10} | compilados {len(self.programs)}/{n} | requisições {self.requests} | "
+                f"tokens/programa {self.tokens_per_program:8.1f} | "
+                f"wall-clock por 1000: {self.per_1000(n):7.2f}s")
+
+
+# ----------------------------
+# BATCH
+# ----------------------------
+def compile_batch(backend, descriptions, batch_size: int = 25, workers: int = 4,
+                  max_rounds: int = 3, rules: str = None) -> BatchReport:
+    """
+    Compila `descriptions` em requisições de até `batch_size` itens, em
+    paralelo (`workers` requisições simultâneas). A cada rodada só os itens
+    ausentes ou inválidos voltam, em lotes com metade do tamanho.
+    """
+    rules = system_rules() if rules is None else rules
+    report = BatchReport()
+    pending = list(enumerate(descriptions))
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(max_rounds):
+            if not pending:
+                break
+            batches = [pending[k:k + batch_size] for k in range(0, len(pending), batch_size)]
+            completions = pool.map(lambda items: backend.complete(batch_prompt(items, rules)), batches)
+
+            retry = []
+            for items, completion in zip(batches, completions):
+                report.requests += 1
+                report.prompt_tokens += completion.prompt_tokens
+                report.output_tokens += completion.output_tokens
+                answers = parse_batch(completion.text)
+                for i, text in items:
+                    if is_valid(answers.get(i)):
+                        report.programs[i] = " ".join(answers[i].split())
+                    else:
+                        retry.append((i, text))
+            pending = retry
+            batch_size = max(batch_size // 2, 1)
+
+    report.failed = [i for i, _ in pending]
+    report.wall_clock = time.perf_counter() - start
+    return report
+
+
+# ----------------------------
+# LAÇO DE CHAT (referência: teste.py)
+# ----------------------------
+def compile_chat_loop(backend, descriptions, rules: str = None) -> BatchReport:
+    """
+    Uma descrição por turno numa conversa que acumula o histórico, como o
+    chat de teste.py: cada turno reenvia todos os anteriores.
+    """
+    rules = system_rules() if rules is None else rules
+    report = BatchReport()
+    history = ""
+    start = time.perf_counter()
+    for i, text in enumerate(descriptions):
+        completion = backend.complete(f"{rules}\n{history}User: {text}\nModel:")
+        report.requests += 1
+        report.prompt_tokens += completion.prompt_tokens
+        report.output_tokens += completion.output_tokens
+        answer = completion.text.strip().split("\n")[0]
+        if is_valid(answer):
+            report.programs[i] = answer
+        else:
+            report.failed.append(i)
+        history += f"User: {text}\nModel: {completion.text.strip()}\n"
+    report.wall_clock = time.perf_counter() - start
+    return report
+
+
+# ----------------------------
+# ORÁCULO PARA O FAKE BACKEND
+# ----------------------------
+def rule_oracle(error_rate: float = 0.05, seed: int = 0):
+    """
+    Responde como um LLM compilador usando as regras de nl_compiler: lista
+    numerada para prompts em lote, uma linha para o chat. Uma fração
+    `error_rate` dos itens sai faltando ou inválida, para exercitar a
+    reconsulta.
+    """
+    from nl_compiler import compile_behavior
+    rng = np.random.default_rng(seed)
+    item = re.compile(r"^(\d+)\. (.+)$", re.MULTILINE)
+
+    def answer(text: str) -> str:
+        if rng.random() < error_rate:
+            return "" if rng.random() < 0.5 else "99 99"
+        return compile_behavior(text).bytecode
+
+    def oracle(prompt: str) -> str:
+        items = item.findall(prompt)
+        if items:
+            return "\n".join(f"{i}: {answer(t)}" for i, t in items)
+        return answer(prompt.rsplit("User: ", 1)[-1].removesuffix("\nModel:"))
+
+    return oracle
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from llm_backends import FakeBackend, make_backend
+
+    parser = argparse.ArgumentParser(description="Compilação em lote de comportamentos vs laço de chat.")
+    parser.add_argument("--model", default="fake", help='backend "provedor:modelo" (ver llm_backends.py)')
+    parser.add_argument("-n", "--behaviors", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-chat", action="store_true", help="não roda a referência do laço de chat")
+    args = parser.parse_args()
+
+    with open("dataset.jsonl", encoding="utf-8") as f:
+        prompts = [m["content"] for line in f for m in json.loads(line)["messages"] if m["role"] == "user"]
+    descriptions = [prompts[i % len(prompts)] for i in range(args.behaviors)]
+
+    if args.model.startswith("fake"):
+        # Latência realista (com espera de verdade) para o wall-clock fazer sentido
+        make = lambda: FakeBackend(args.model, oracle=rule_oracle(), base_latency=0.3,
+                                   prefill_per_token=5e-5, decode_per_token=2e-3, sleep=True)
+    else:
+        make = lambda: make_backend(args.model)
+
+    batch = compile_batch(make(), descriptions, args.batch_size, args.workers)
+    print(batch.summary("lote", args.behaviors))
+    if batch.failed:
+        print(f"  falharam após as reconsultas: {batch.failed[:20]}")
+
+    if not args.no_chat:
+        chat = compile_chat_loop(make(), descriptions)
+        print(chat.summary("chat", args.behaviors))
+        print(f"Redução: {chat.tokens_per_program / batch.tokens_per_program:.1f}x tokens/programa | "
+              f"{chat.wall_clock / batch.wall_clock:.1f}x wall-clock")
@@ -5,13 +5,16 @@
 # ============================================================
 
 import time
-import matplotlib.pyplot as plt
 import numpy as np
 import tiktoken
-from dataclasses import dataclass
-from numba import njit
+from prompt_cache import load_cache_ratio
+from report_builder import SCALABILITY_COLUMNS, latest_run, run_id, scalability_figure
+from results_log import ResultsLog
+from traditional import consume, move, rotate, seek, set_color, set_shape, set_speed
 from transformers import AutoTokenizer
 from typing import Union
+from vexi_isa import CONSUME, MOVE, ROTATE, SEEK, SET_COLOR, SET_SHAPE, SET_SPEED
+from vvm import EntityState, array_to_entity, entity_to_array, run_program
 
 
 tokenizers = {
@@ -39,82 +42,6 @@ def count_tokens(tokenizer, text: str) -> int:
         return len(tokenizer.encode(text))
     return len(tokenizer(text)["input_ids"])
 
-# ----------------------------
-# ENTITY STATE
-# ----------------------------
-@dataclass
-class EntityState:
-    x: int = 0
-    y: int = 0
-    rotation: int = 0
-    color: int = 0
-    speed: int = 1
-    shape: int = 1
-
-# ----------------------------
-# OPCODES
-# ----------------------------
-SET_SHAPE = 10
-SET_COLOR = 11
-SET_SPEED = 12
-MOVE      = 20
-ROTATE    = 21
-SEEK      = 30
-CONSUME   = 31
-
-# ----------------------------
-# VVM EXECUTION — Numba + NumPy
-# ----------------------------
-@njit
-def execute_instruction(state_arr, ip, program):
-    opcode = program[ip]
-    ip += 1
-    
-    if opcode == SET_SHAPE:
-        state_arr[5] = program[ip]  # shape
-        ip += 1
-    elif opcode == SET_COLOR:
-        state_arr[3] = program[ip]  # color
-        ip += 1
-    elif opcode == SET_SPEED:
-        state_arr[4] = program[ip]  # speed
-        ip += 1
-    elif opcode == MOVE:
-        dx = program[ip]
-        dy = program[ip+1]
-        state_arr[0] += dx * state_arr[4]
-        state_arr[1] += dy * state_arr[4]
-        ip += 2
-    elif opcode == ROTATE:
-        state_arr[2] += program[ip]
-        ip += 1
-    elif opcode == SEEK:
-        tx = program[ip]
-        ty = program[ip+1]
-        ip += 2
-        if state_arr[0] < tx: state_arr[0] += state_arr[4]
-        if state_arr[0] > tx: state_arr[0] -= state_arr[4]
-        if state_arr[1] < ty: state_arr[1] += state_arr[4]
-        if state_arr[1] > ty: state_arr[1] -= state_arr[4]
-    elif opcode == CONSUME:
-        pass
-    else:
-        raise ValueError(f"Invalid opcode {opcode}")
-    
-    return ip
-
-@njit
-def run_program(state_arr, program):
-    ip = 0
-    while ip < len(program):
-        ip = execute_instruction(state_arr, ip, program)
-
-def entity_to_array(entity: EntityState):
-    return np.array([entity.x, entity.y, entity.rotation, entity.color, entity.speed, entity.shape], dtype=np.int64)
-
-def array_to_entity(state_arr, entity: EntityState):
-    entity.x, entity.y, entity.rotation, entity.color, entity.speed, entity.shape = state_arr
-
 # ----------------------------
 # SEMANTICALLY EQUIVALENT PROGRAMS
 # ----------------------------
@@ -131,17 +58,6 @@ VVM_PROGRAM = np.array([
 ], dtype=np.int64)
 
 
-def set_shape(e, v): e.shape = v
-def set_color(e, v): e.color = v
-def set_speed(e, v): e.speed = v
-def move(e, dx, dy): e.x += dx * e.speed; e.y += dy * e.speed
-def rotate(e, a): e.rotation += a
-def seek(e, tx, ty):
-    if e.x < tx: e.x += e.speed
-    if e.x > tx: e.x -= e.speed
-    if e.y < ty: e.y += e.speed
-    if e.y > ty: e.y -= e.speed
-def consume(e): pass
 # ----------------------------
 # TRADITIONAL CODE (REFERENCE)
 # ----------------------------
@@ -223,71 +139,57 @@ exec_env = {
 exec(TRADITIONAL_CODE, exec_env)
 print("Final entity state (TRADITIONAL_CODE):", entity_trad)
 
+# ----------------------------
+# COST MODEL — GPT-5.2
+# ----------------------------
+COST_MODEL = "GPT-5.2"
+COST_INPUT = 1.75
+COST_CACHE = 0.175
+# Fração em cache medida por saturacao_context.py (cache_stats.json);
+# 0.70 apenas como estimativa enquanto não houver medição.
+CACHE_RATIO = load_cache_ratio(default=0.70)
+
+EFFECTIVE_COST = COST_INPUT * (1 - CACHE_RATIO) + COST_CACHE * CACHE_RATIO
+
 # ----------------------------
 # BENCHMARK 3 — SCALE
 # ----------------------------
 ITERATIONS = [1, 10, 100, 1_000, 10_000, 100_000]
 tokenizer_base = tokenizers["GPT-cl100k"]
+tokens_per_run = {
+    "Traditional": count_tokens(tokenizer_base, TRADITIONAL_CODE),
+    "VVM": count_tokens(tokenizer_base, SERIALIZED_VVM),
+}
 
-tokens_traditional = []
-tokens_vvm = []
-time_traditional = []
-time_vvm = []
+# Cada escala vai para o log assim que termina; a figura pode ser gerada
+# durante a execução com: python report_builder.py escalabilidade benchmark_escalabilidade_flat.log
+results_log = ResultsLog("benchmark_escalabilidade_flat.log", SCALABILITY_COLUMNS)
+RUN_ID = run_id()
 
 for n in ITERATIONS:
-    tokens_traditional.append(count_tokens(tokenizer_base, TRADITIONAL_CODE) * n)
-    tokens_vvm.append(count_tokens(tokenizer_base, SERIALIZED_VVM) * n)
-
     # VVM
     state_arr = entity_to_array(EntityState())
     start = time.perf_counter()
     for _ in range(n):
         run_program(state_arr, VVM_PROGRAM)
-    time_vvm.append(time.perf_counter() - start)
+    time_vvm = time.perf_counter() - start
 
     # Traditional (somente overhead, simulação)
     start = time.perf_counter()
     for _ in range(n):
         pass
-    time_traditional.append(time.perf_counter() - start)
-
-# ----------------------------
-# COST MODEL — GPT-5.2
-# ----------------------------
-COST_INPUT = 1.75
-COST_CACHE = 0.175
-CACHE_RATIO = 0.70
-
-EFFECTIVE_COST = COST_INPUT * (1 - CACHE_RATIO) + COST_CACHE * CACHE_RATIO
+    time_traditional = time.perf_counter() - start
 
-cost_traditional = [(t / 1_000_000) * EFFECTIVE_COST for t in tokens_traditional]
-cost_vvm = [(t / 1_000_000) * EFFECTIVE_COST for t in tokens_vvm]
+    tokens = np.array([tokens_per_run["Traditional"], tokens_per_run["VVM"]], dtype=np.float64) * n
+    results_log.append(
+        run=RUN_ID, series=np.array(["Traditional", "VVM"]), n=n, tokens=tokens,
+        time=np.array([time_traditional, time_vvm]), cost=tokens / 1_000_000 * EFFECTIVE_COST,
+    )
 
 # ----------------------------
 # PLOTS
 # ----------------------------
-fig, axes = plt.subplots(1, 3, figsize=(20, 6))
-
-axes[0].plot(ITERATIONS, tokens_traditional, marker="o", label="Traditional")
-axes[0].plot(ITERATIONS, tokens_vvm, marker="o", label="VVM")
-axes[0].set_xscale("log"); axes[0].set_yscale("log")
-axes[0].set_title("Tokens vs Scale")
-axes[0].legend(); axes[0].grid(True)
-
-axes[1].plot(ITERATIONS, time_traditional, marker="o", label="Traditional")
-axes[1].plot(ITERATIONS, time_vvm, marker="o", label="VVM")
-axes[1].set_xscale("log"); axes[1].set_yscale("log")
-axes[1].set_title("Execution Time vs Scale")
-axes[1].legend(); axes[1].grid(True)
-
-axes[2].plot(ITERATIONS, cost_traditional, marker="o", label="Traditional")
-axes[2].plot(ITERATIONS, cost_vvm, marker="o", label="VVM")
-axes[2].set_xscale("log"); axes[2].set_yscale("log")
-axes[2].set_title("Cost vs Scale (GPT-5.2)")
-axes[2].legend(); axes[2].grid(True)
-
-plt.suptitle("VVM Realtime Benchmark — Semantic Equivalence (Numba + NumPy)")
-plt.tight_layout()
-plt.show()
+scalability_figure(latest_run(results_log.read()), "benchmark_escalabilidade_flat.png", cost_model=COST_MODEL)
+print("Figura salva em benchmark_escalabilidade_flat.png")
 
 print("\n✅ Benchmark completed (optimized VVM with Numba + NumPy).")
@@ -0,0 +1,246 @@
+# ============================================================
+# DATASET TOOLS — VALIDAÇÃO E EXECUÇÃO EM MASSA DO CORPUS
+# dataset.jsonl -> array int32 empacotado + offsets
+# Validação e execução paralelas (Numba), digest do estado final
+# ============================================================
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+from numba import njit, prange
+
+from program_store import ProgramStore
+from vvm import STATE_SIZE, new_states, run_batch, validate_batch
+
+# Caminho rápido para o formato de gerar_codigo_vexi.py; linhas em outro
+# formato (JSON compacto, escapes, outra ordem de chaves) vão para o json.
+MODEL_CONTENT = re.compile(rb'"role"\s*:\s*"model"\s*,\s*"content"\s*:\s*"([^"\\]*)"')
+INVALID_TOKEN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+
+# ----------------------------
+# PARSING
+# ----------------------------
+def _model_content(line: bytes) -> bytes:
+    m = MODEL_CONTENT.search(line)
+    if m:
+        return m.group(1)
+    try:
+        messages = json.loads(line)["messages"]
+        return next(m["content"] for m in messages if m["role"] == "model").encode("utf-8")
+    except (ValueError, KeyError, TypeError, StopIteration):
+        return b""
+
+
+def extract_bytecode(raw: bytes) -> bytes:
+    """
+    Extrai a resposta do modelo de cada linha do JSONL (sem a quebra final
+    do arquivo) e devolve um programa por linha. Uma linha sem resposta do
+    modelo vira um programa vazio, para que o programa i continue sendo a
+    linha i + 1 do arquivo; check_corpus marca programas vazios como
+    inválidos.
+    """
+    return b"\n".join(_model_content(line) for line in raw.split(b"\n"))
+
+
+@njit
+def _count(buf):
+    n_tokens, n_programs, in_token = 0, 1, False
+    for c in buf:
+        if c == 10:  # \n
+            n_programs += 1
+            in_token = False
+        elif c == 32:
+            in_token = False
+        elif not in_token:
+            n_tokens += 1
+            in_token = True
+    return n_tokens, n_programs
+
+
+@njit
+def parse_packed(buf):
+    """
+    Converte texto (uint8, um programa por linha, inteiros separados por
+    espaço) em (flat int32, offsets int64). Tokens não numéricos ou fora da
+    faixa do int32 viram INVALID_TOKEN, que o validador rejeita.
+    """
+    n_tokens, n_programs = _count(buf)
+    flat = np.empty(n_tokens, dtype=np.int32)
+    offsets = np.empty(n_programs + 1, dtype=np.int64)
+    offsets[0] = 0
+
+    t, p = 0, 0
+    value, sign, in_token, bad, digits = 0, 1, False, False, False
+    for i in range(len(buf) + 1):
+        c = buf[i] if i < len(buf) else 10
+        if c == 10 or c == 32:
+            if in_token:
+                # Um '-' sem dígitos também é inválido
+                flat[t] = INVALID_TOKEN if bad or not digits else sign * value
+                t += 1
+            value, sign, in_token, bad, digits = 0, 1, False, False, False
+            if c == 10:
+                p += 1
+                offsets[p] = t
+        else:
+            if not in_token:
+                in_token = True
+                if c == 45:  # '-'
+                    sign = -1
+                    continue
+            if 48 <= c <= 57:
+                digits = True
+                if not bad:
+                    value = value * 10 + (c - 48)
+                    if value > INT32_MAX:
+                        bad = True
+            else:
+                bad = True
+
+    return flat, offsets
+
+
+def read_bytecode(path: str) -> bytes:
+    """
+    Lê dataset.jsonl (ou um arquivo de bytecode puro) como texto com um
+    programa por linha. Só a quebra de linha final do arquivo é removida:
+    o número de programas é sempre o número de linhas.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw.endswith(b"\n"):
+        raw = raw[:-1]
+    if path.endswith(".jsonl"):
+        raw = extract_bytecode(raw)
+    return raw
+
+
+def load_corpus(path: str):
+    return parse_packed(np.frombuffer(read_bytecode(path), dtype=np.uint8))
+
+
+# ----------------------------
+# DIGEST DO ESTADO FINAL
+# ----------------------------
+FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+
+@njit(parallel=True)
+def state_digests(states):
+    """
+    FNV-1a 64 bits de cada linha de estado (um digest por entidade).
+    """
+    n = states.shape[0]
+    out = np.empty(n, dtype=np.uint64)
+    for i in prange(n):
+        h = FNV_OFFSET
+        for k in range(states.shape[1]):
+            h = (h ^ np.uint64(states[i, k])) * FNV_PRIME
+        out[i] = h
+    return out
+
+
+@njit
+def corpus_digest(digests, h=FNV_OFFSET):
+    """
+    Digest único do corpus, dependente da ordem dos programas. `h` permite
+    encadear o digest de blocos consecutivos.
+    """
+    for d in digests:
+        h = (h ^ d) * FNV_PRIME
+    return h
+
+
+# ----------------------------
+# PIPELINE
+# ----------------------------
+def check_corpus(flat, offsets):
+    """
+    Valida e executa todos os programas. Retorna (errors, states, digests):
+    errors[i] = -1 ou posição do primeiro token inválido do programa i
+    (0 para um programa vazio: linha sem resposta do modelo ou em branco);
+    programas inválidos não são executados e ficam com o estado padrão.
+    """
+    errors = validate_batch(flat, offsets)
+    errors[np.diff(offsets) == 0] = 0
+    states = new_states(len(offsets) - 1)
+    run_batch(states, flat, offsets, errors < 0)
+    return errors, states, state_digests(states)
+
+
+def check_store(store: ProgramStore, programs_per_chunk: int = 1_000_000):
+    """
+    Como check_corpus, mas bloco a bloco direto do memmap: a memória fica
+    limitada ao bloco corrente. Retorna (índices inválidos, posições, digest).
+    """
+    invalid, positions = [], []
+    h = FNV_OFFSET
+    start = 0
+    for flat, offsets in store.chunks(programs_per_chunk):
+        errors, _, digests = check_corpus(flat, offsets)
+        bad = np.flatnonzero(errors >= 0)
+        invalid.append(bad + start)
+        positions.append(errors[bad])
+        h = corpus_digest(digests, h)
+        start += len(offsets) - 1
+    if not invalid:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), h
+    return np.concatenate(invalid), np.concatenate(positions), h
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Valida e executa o corpus de bytecode em massa.")
+    parser.add_argument("path", nargs="?", default="dataset.jsonl", help="JSONL, bytecode puro ou diretório de ProgramStore")
+    parser.add_argument("--repeat", type=int, default=1, help="replica o corpus N vezes (benchmark)")
+    parser.add_argument("--to-store", help="grava o corpus parseado neste ProgramStore")
+    args = parser.parse_args()
+
+    # Compila os kernels fora da medição (arrays graváveis e somente-leitura,
+    # como os do memmap, geram especializações distintas no Numba)
+    flat, offsets = parse_packed(np.frombuffer(b"31", dtype=np.uint8))
+    check_corpus(flat, offsets)
+    flat.flags.writeable = False
+    check_corpus(flat, offsets)
+
+    if os.path.isdir(args.path):
+        store = ProgramStore(args.path)
+        start = time.perf_counter()
+        invalid, positions, digest = check_store(store)
+        t_run = time.perf_counter() - start
+
+        print(f"Programas: {len(store):,} | Tokens: {len(store.flat):,} | Estado: {STATE_SIZE} campos")
+        print(f"Validação + execução + digest (memmap): {t_run:.3f}s")
+        print(f"Inválidos: {len(invalid)}")
+        for i, pos in zip(invalid[:20], positions[:20]):
+            print(f"  programa {i}: token {pos} -> {store[i].tolist()}")
+        print(f"Digest do corpus: {digest:016x}")
+        raise SystemExit
+
+    raw = b"\n".join([read_bytecode(args.path)] * args.repeat)
+
+    start = time.perf_counter()
+    flat, offsets = parse_packed(np.frombuffer(raw, dtype=np.uint8))
+    t_parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    errors, states, digests = check_corpus(flat, offsets)
+    t_run = time.perf_counter() - start
+
+    invalid = np.flatnonzero(errors >= 0)
+    print(f"Programas: {len(offsets) - 1:,} | Tokens: {len(flat):,} | Estado: {STATE_SIZE} campos")
+    print(f"Parse: {t_parse:.3f}s | Validação + execução + digest: {t_run:.3f}s")
+    print(f"Inválidos: {len(invalid)}")
+    for i in invalid[:20]:
+        print(f"  linha {i + 1}: token {errors[i]} -> {flat[offsets[i]:offsets[i+1]].tolist()}")
+    print(f"Digest do corpus: {corpus_digest(digests):016x}")
+
+    if args.to_store:
+        ProgramStore(args.to_store).append(flat, offsets)
+        print(f"Corpus gravado em {args.to_store}")
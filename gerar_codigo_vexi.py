@@ -1,23 +1,29 @@
 import json
 import random
 
+from vexi_isa import BY_NAME, COLORS as ISA_COLORS, DATASET_SYSTEM_PROMPT, OPCODES, SHAPES as ISA_SHAPES
+from vexi_isa import parse_program
+from vvm import validate_program
+
 # ==========================================
-# CONFIGURAÇÃO DA VVM (Tabela de Verdade)
+# CONFIGURAÇÃO DA VVM (Tabela de Verdade em vexi_isa.py)
 # ==========================================
-OPCODES = {
-    "SPAWN": 1,
-    "SET_SHAPE": 10,
-    "SET_COLOR": 11,
-    "SET_SPEED": 12,
-    "MOVE": 20,
-    "ROTATE": 21,
-    "SEEK": 30,
-    "CONSUME": 31
+# Dicionários para dar variedade linguística
+SHAPES = {v: name for v, (_, name) in ISA_SHAPES.items()}
+COLORS = {v: name for v, (_, name) in ISA_COLORS.items()}
+
+# Mistura de ações de generate_sample (também usada pelo vvm_fuzz.py)
+ACTIONS = ["MOVE", "COLOR", "SHAPE", "SPEED", "ROTATE", "SEEK", "CONSUME"]
+ACTION_INSTRUCTIONS = {
+    "MOVE": "MOVE", "COLOR": "SET_COLOR", "SHAPE": "SET_SHAPE", "SPEED": "SET_SPEED",
+    "ROTATE": "ROTATE", "SEEK": "SEEK", "CONSUME": "CONSUME",
 }
+ROTATE_ANGLES = [45, 90, 180, 270]
+MIN_STEPS, MAX_STEPS = 3, 8
 
-# Dicionários para dar variedade linguística
-SHAPES = {1: "Círculo", 2: "Quadrado", 3: "Triângulo"}
-COLORS = {1: "Vermelho", 2: "Azul", 3: "Verde"}
+def operand_range(name, k=0):
+    op = BY_NAME[name].operands[k]
+    return op.lo, op.hi
 
 def generate_sample():
     """
@@ -25,22 +31,22 @@ def generate_sample():
     """
     
     # Quantas ações essa entidade vai fazer? (Entre 3 e 8 passos)
-    num_steps = random.randint(3, 8)
+    num_steps = random.randint(MIN_STEPS, MAX_STEPS)
     
     narrative_parts = []
     bytecode_parts = []
     
     # Passo 1: Sempre começa com Spawn (para consistência)
-    type_id = random.randint(1, 3)
+    type_id = random.randint(*operand_range("SPAWN"))
     narrative_parts.append(f"Spawne uma entidade do tipo {type_id}.")
     bytecode_parts.extend([str(OPCODES["SPAWN"]), str(type_id)])
     
     # Passo 2: Gera ações aleatórias
     for _ in range(num_steps):
-        action = random.choice(["MOVE", "COLOR", "SHAPE", "SPEED", "ROTATE", "SEEK", "CONSUME"])
+        action = random.choice(ACTIONS)
         
         if action == "MOVE":
-            x, y = random.randint(0, 100), random.randint(0, 100)
+            x, y = random.randint(*operand_range("MOVE", 0)), random.randint(*operand_range("MOVE", 1))
             narrative_parts.append(random.choice([
                 f"Mova para x={x}, y={y}.",
                 f"Vá para a posição {x}, {y}.",
@@ -49,7 +55,7 @@ def generate_sample():
             bytecode_parts.extend([str(OPCODES["MOVE"]), str(x), str(y)])
             
         elif action == "COLOR":
-            c_id = random.randint(1, 3)
+            c_id = random.randint(*operand_range("SET_COLOR"))
             c_name = COLORS[c_id]
             narrative_parts.append(random.choice([
                 f"Mude a cor para {c_name}.",
@@ -59,23 +65,23 @@ def generate_sample():
             bytecode_parts.extend([str(OPCODES["SET_COLOR"]), str(c_id)])
             
         elif action == "SHAPE":
-            s_id = random.randint(1, 3)
+            s_id = random.randint(*operand_range("SET_SHAPE"))
             s_name = SHAPES[s_id]
             narrative_parts.append(f"Transforme-se em um {s_name}.")
             bytecode_parts.extend([str(OPCODES["SET_SHAPE"]), str(s_id)])
             
         elif action == "SPEED":
-            val = random.randint(1, 20)
+            val = random.randint(*operand_range("SET_SPEED"))
             narrative_parts.append(f"Ajuste velocidade para {val}.")
             bytecode_parts.extend([str(OPCODES["SET_SPEED"]), str(val)])
             
         elif action == "ROTATE":
-            deg = random.choice([45, 90, 180, 270])
+            deg = random.choice(ROTATE_ANGLES)
             narrative_parts.append(f"Gire {deg} graus.")
             bytecode_parts.extend([str(OPCODES["ROTATE"]), str(deg)])
 
         elif action == "SEEK":
-            tx, ty = random.randint(0, 100), random.randint(0, 100)
+            tx, ty = random.randint(*operand_range("SEEK", 0)), random.randint(*operand_range("SEEK", 1))
             narrative_parts.append(f"Busque o alvo em {tx}, {ty}.")
             bytecode_parts.extend([str(OPCODES["SEEK"]), str(tx), str(ty)])
             
@@ -92,36 +98,38 @@ def generate_sample():
 # ==========================================
 # GERAÇÃO DO ARQUIVO
 # ==========================================
-NUM_EXAMPLES = 500 # 500 é um bom número para começar
-OUTPUT_FILE = "vexi_dataset.jsonl"
+if __name__ == "__main__":
+    NUM_EXAMPLES = 500 # 500 é um bom número para começar
+    OUTPUT_FILE = "vexi_dataset.jsonl"
 
-print(f"🔨 Gerando {NUM_EXAMPLES} exemplos de treinamento...")
+    print(f"🔨 Gerando {NUM_EXAMPLES} exemplos de treinamento...")
 
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    for _ in range(NUM_EXAMPLES):
-        prompt, code = generate_sample()
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        for _ in range(NUM_EXAMPLES):
+            prompt, code = generate_sample()
+            assert validate_program(parse_program(code)) == -1, f"Invalid bytecode: {code}"
         
-        # Formato Padrão Chat (Aceito por Gemini e OpenAI)
-        training_entry = {
-            "messages": [
-                {
-                    "role": "system", 
-                    "content": "You are VexiCompiler. Translate natural language instructions into raw integer bytecode sequences separated by spaces. No text, only numbers."
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                },
-                {
-                    "role": "model", # Nota: OpenAI usa 'assistant', Google usa 'model'
-                    "content": code
-                }
-            ]
-        }
+            # Formato Padrão Chat (Aceito por Gemini e OpenAI)
+            training_entry = {
+                "messages": [
+                    {
+                        "role": "system", 
+                        "content": DATASET_SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user", 
+                        "content": prompt
+                    },
+                    {
+                        "role": "model", # Nota: OpenAI usa 'assistant', Google usa 'model'
+                        "content": code
+                    }
+                ]
+            }
         
-        f.write(json.dumps(training_entry) + "\n")
+            f.write(json.dumps(training_entry) + "\n")
 
-print(f"✅ Sucesso! Arquivo '{OUTPUT_FILE}' criado.")
-print("Exemplo gerado:")
-print(f"User:  {prompt}")
-print(f"Model: {code}")
\ No newline at end of file
+    print(f"✅ Sucesso! Arquivo '{OUTPUT_FILE}' criado.")
+    print("Exemplo gerado:")
+    print(f"User:  {prompt}")
+    print(f"Model: {code}")
\ No newline at end of file
@@ -0,0 +1,237 @@
+# ============================================================
+# LLM BACKENDS — INTERFACE ÚNICA PARA OS BENCHMARKS
+# Gemini (google.genai), OpenAI, modelo local (transformers) e fake offline
+# Streaming: mede time-to-first-token e latência total de cada chamada
+# ============================================================
+
+import math
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import numpy as np
+
+from prompt_cache import stub_answer
+
+
+@dataclass
+class Completion:
+    text: str
+    prompt_tokens: int
+    output_tokens: int
+    ttft: float      # segundos até o primeiro trecho de texto (NaN se desconhecido)
+    latency: float   # segundos até a resposta completa
+
+
+class Backend(ABC):
+    """
+    `complete(prompt)` envia um prompt de usuário único, sem histórico, e
+    retorna uma Completion. `count_tokens(text)` usa o tokenizador do
+    próprio provedor. `name` identifica o backend nas tabelas.
+    """
+
+    name = "backend"
+
+    @abstractmethod
+    def count_tokens(self, text: str) -> int:
+        ...
+
+    @abstractmethod
+    def complete(self, prompt: str) -> Completion:
+        ...
+
+
+# ----------------------------
+# GEMINI
+# ----------------------------
+class GeminiBackend(Backend):
+    """
+    `client` pode ser um genai.Client ou um llm_cache.CachedClient; o cache
+    não grava streams, então com ele a chamada é única e o TTFT fica NaN.
+    """
+
+    def __init__(self, model: str = "gemini-2.5-flash-lite", client=None):
+        if client is None:
+            from google import genai
+            client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self.client = client
+        self.model = model
+        self.name = f"gemini:{model}"
+
+    def count_tokens(self, text: str) -> int:
+        return self.client.models.count_tokens(model=self.model, contents=text).total_tokens
+
+    def complete(self, prompt: str) -> Completion:
+        config = {"temperature": 0.0}
+        stream = getattr(self.client.models, "generate_content_stream", None)
+        start = time.perf_counter()
+
+        if stream is None:
+            response = self.client.models.generate_content(model=self.model, contents=prompt, config=config)
+            latency = getattr(response, "latency", time.perf_counter() - start)
+            usage = response.usage_metadata
+            return Completion(response.text or "", getattr(usage, "prompt_token_count", None) or 0,
+                              getattr(usage, "candidates_token_count", None) or 0, math.nan, latency)
+
+        parts, ttft, usage = [], math.nan, None
+        for chunk in stream(model=self.model, contents=prompt, config=config):
+            if chunk.text:
+                if not parts:
+                    ttft = time.perf_counter() - start
+                parts.append(chunk.text)
+            usage = chunk.usage_metadata or usage
+        latency = time.perf_counter() - start
+        return Completion("".join(parts), getattr(usage, "prompt_token_count", None) or 0,
+                          getattr(usage, "candidates_token_count", None) or 0, ttft, latency)
+
+
+# ----------------------------
+# OPENAI
+# ----------------------------
+class OpenAIBackend(Backend):
+    def __init__(self, model: str = "gpt-4o-mini", client=None):
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI()
+        import tiktoken
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("o200k_base")
+        self.client = client
+        self.model = model
+        self.name = f"openai:{model}"
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text))
+
+    def complete(self, prompt: str) -> Completion:
+        start = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.0,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parts, ttft, usage = [], math.nan, None
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                if not parts:
+                    ttft = time.perf_counter() - start
+                parts.append(chunk.choices[0].delta.content)
+            usage = chunk.usage or usage
+        latency = time.perf_counter() - start
+        return Completion("".join(parts), usage.prompt_tokens if usage else 0,
+                          usage.completion_tokens if usage else 0, ttft, latency)
+
+
+# ----------------------------
+# MODELO LOCAL (transformers)
+# ----------------------------
+class HFBackend(Backend):
+    """
+    Modelo causal local, greedy. O texto chega por um TextIteratorStreamer
+    enquanto generate() roda numa thread, o que dá o TTFT real do prefill.
+    """
+
+    def __init__(self, model: str = "distilgpt2", max_new_tokens: int = 8):
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(model)
+        self.model = AutoModelForCausalLM.from_pretrained(model)
+        self.max_new_tokens = max_new_tokens
+        self.name = f"hf:{model}"
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer(text)["input_ids"])
+
+    def complete(self, prompt: str) -> Completion:
+        from threading import Thread
+        from transformers import TextIteratorStreamer
+
+        inputs = self.tokenizer(prompt, return_tensors="pt")
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        kwargs = dict(**inputs, max_new_tokens=self.max_new_tokens, do_sample=False,
+                      streamer=streamer, pad_token_id=self.tokenizer.eos_token_id)
+
+        start = time.perf_counter()
+        thread = Thread(target=self.model.generate, kwargs=kwargs)
+        thread.start()
+        parts, ttft = [], math.nan
+        for piece in streamer:
+            if piece and not parts:
+                ttft = time.perf_counter() - start
+            parts.append(piece)
+        thread.join()
+        latency = time.perf_counter() - start
+
+        text = "".join(parts)
+        return Completion(text, inputs["input_ids"].shape[1], self.count_tokens(text), ttft, latency)
+
+
+# ----------------------------
+# FAKE OFFLINE
+# ----------------------------
+class FakeBackend(Backend):
+    """
+    Backend determinístico, sem rede, para testar o pipeline. A latência
+    segue um modelo simples de prefill (por token de entrada) mais decode
+    (por token de saída), com ruído log-normal. Com sleep=True a chamada
+    realmente espera esse tempo. Na contagem de tokens, letras são agrupadas
+    de 4 em 4 e dígitos de 3 em 3, como num BPE, para que texto denso
+    (base64) não pareça um token só.
+
+    `oracle(prompt)` produz a resposta; o padrão é prompt_cache.stub_answer,
+    o mesmo oráculo do StubClient.
+    """
+
+    TOKEN = re.compile(r"[A-Za-z]{1,4}|\d{1,3}|[^\sA-Za-z\d]")
+
+    def __init__(self, name: str = "fake", oracle=None, base_latency: float = 0.05,
+                 prefill_per_token: float = 2e-5, decode_per_token: float = 5e-3,
+                 noise: float = 0.1, sleep: bool = False, seed: int = 0):
+        self.name = name if name.startswith("fake") else f"fake:{name}"
+        self.oracle = oracle or stub_answer
+        self.base_latency = base_latency
+        self.prefill_per_token = prefill_per_token
+        self.decode_per_token = decode_per_token
+        self.noise = noise
+        self.sleep = sleep
+        self.rng = np.random.default_rng(seed)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.TOKEN.findall(text))
+
+    def complete(self, prompt: str) -> Completion:
+        text = self.oracle(prompt)
+        prompt_tokens, output_tokens = self.count_tokens(prompt), max(self.count_tokens(text), 1)
+        jitter = self.rng.lognormal(0.0, self.noise, 2) if self.noise else np.ones(2)
+        ttft = (self.base_latency + prompt_tokens * self.prefill_per_token) * jitter[0]
+        latency = ttft + output_tokens * self.decode_per_token * jitter[1]
+        if self.sleep:
+            time.sleep(latency)
+        return Completion(text, prompt_tokens, output_tokens, float(ttft), float(latency))
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "openai": OpenAIBackend,
+    "hf": HFBackend,
+    "fake": FakeBackend,
+}
+
+
+def make_backend(spec: str, **kwargs) -> Backend:
+    """
+    "provedor:modelo" -> Backend, por exemplo "gemini:gemini-2.5-flash",
+    "openai:gpt-4o-mini", "hf:distilgpt2" ou "fake".
+    """
+    provider, _, model = spec.partition(":")
+    if provider not in BACKENDS:
+        raise ValueError(f"Unknown backend {provider!r}, expected one of {tuple(BACKENDS)}")
+    cls = BACKENDS[provider]
+    if provider == "fake":
+        return cls(name=spec, **kwargs)
+    return cls(model, **kwargs) if model else cls(**kwargs)
@@ -0,0 +1,258 @@
+# ============================================================
+# LLM RESPONSE CACHE — RECORD / REPLAY
+# Envolve client.models.generate_content / count_tokens
+# Store local em JSONL: hash da requisição -> texto, uso e latência
+# ============================================================
+
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+import numpy as np
+
+# off:    sempre chama a API, nada é gravado
+# record: sempre chama a API e grava cada resposta
+# replay: só lê do store (erro se a requisição não estiver gravada)
+# auto:   lê do store quando houver amostra, senão chama a API e grava
+MODES = ("off", "record", "replay", "auto")
+
+
+# ----------------------------
+# RESPOSTAS
+# ----------------------------
+@dataclass
+class CachedResponse:
+    text: str
+    usage_metadata: SimpleNamespace = field(default_factory=SimpleNamespace)
+    latency: float = 0.0
+
+
+@dataclass
+class CachedTokenCount:
+    total_tokens: int
+
+
+def _to_dict(obj) -> dict:
+    if obj is None:
+        return {}
+    if isinstance(obj, dict):
+        return obj
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(exclude_none=True, mode="json")
+    return dict(vars(obj))
+
+
+def request_key(kind: str, model: str, contents, config=None) -> str:
+    """
+    Hash estável da requisição (tipo de chamada, modelo, conteúdo e config).
+    """
+    payload = json.dumps(
+        [kind, model, contents, _to_dict(config) if config is not None else None],
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ----------------------------
+# STORE (JSONL, somente append)
+# ----------------------------
+class ResponseStore:
+    """
+    Uma linha por amostra. Uma linha com "reset" descarta as amostras
+    anteriores da mesma chave (reamostragem): o arquivo continua somente
+    append, mas a célula passa a ter só as amostras novas.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = defaultdict(list)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry.get("reset"):
+                            self.records[entry["key"]] = []
+                        self.records[entry["key"]].append(entry["record"])
+
+    def get(self, key: str) -> list:
+        return self.records.get(key, [])
+
+    def append(self, key: str, record: dict, reset: bool = False):
+        entry = {"key": key, "record": record}
+        if reset:
+            self.records[key] = []
+            entry["reset"] = True
+        self.records[key].append(record)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+# ----------------------------
+# CLIENT
+# ----------------------------
+class _CachedModels:
+    def __init__(self, live_models, store: ResponseStore, mode: str, resample_cv, aliases: dict):
+        self._live = live_models
+        self._aliases = aliases
+        self._store = store
+        self._mode = mode
+        self._resample_cv = resample_cv
+        self._cursor = defaultdict(int)
+        self._resampling = {}
+        self._resampled = set()
+
+    def _needs_resample(self, key: str, samples: list) -> bool:
+        # Decidido uma vez por célula, para que todas as repetições dela
+        # venham da mesma fonte.
+        if key not in self._resampling:
+            latencies = np.array([s["latency"] for s in samples], dtype=np.float64)
+            cv = latencies.std() / latencies.mean() if len(latencies) > 1 and latencies.mean() > 0 else 0.0
+            self._resampling[key] = self._resample_cv is not None and cv > self._resample_cv
+        return self._resampling[key]
+
+    def _require_live(self, key: str):
+        if self._live is None:
+            raise KeyError(f"Request {key[:12]} not in cache and no live client available")
+
+    def generate_content(self, model, contents, config=None):
+        key = request_key("generate_content", model, contents, config)
+        samples = self._store.get(key)
+        i = self._cursor[key]
+        self._cursor[key] += 1
+
+        replaying = self._mode in ("replay", "auto") and samples and not self._needs_resample(key, samples)
+        if replaying and (i < len(samples) or self._mode == "replay"):
+            # No replay puro, menos amostras gravadas que repetições: recicla.
+            s = samples[i % len(samples)]
+            return CachedResponse(s["text"], SimpleNamespace(**s["usage_metadata"]), s["latency"])
+
+        self._require_live(key)
+        if isinstance(config, dict) and config.get("cached_content") in self._aliases:
+            config = {**config, "cached_content": self._aliases[config["cached_content"]]}
+
+        start = time.time()
+        response = self._live.generate_content(model=model, contents=contents, config=config)
+        latency = time.time() - start
+
+        record = {
+            "text": response.text or "",
+            "usage_metadata": _to_dict(response.usage_metadata),
+            "latency": latency,
+        }
+        if self._mode != "off":
+            # A primeira amostra de uma reamostragem substitui as antigas: o
+            # replay e o CV seguintes usam só as amostras novas.
+            reset = self._resampling.get(key, False) and key not in self._resampled
+            if reset:
+                self._resampled.add(key)
+            self._store.append(key, record, reset=reset)
+        return CachedResponse(record["text"], SimpleNamespace(**record["usage_metadata"]), latency)
+
+    def count_tokens(self, model, contents, config=None):
+        # Contagem de tokens é determinística: uma amostra basta.
+        key = request_key("count_tokens", model, contents, config)
+        samples = self._store.get(key)
+        if self._mode in ("replay", "auto") and samples:
+            return CachedTokenCount(samples[0]["total_tokens"])
+
+        self._require_live(key)
+        total = self._live.count_tokens(model=model, contents=contents, config=config).total_tokens
+        if self._mode != "off":
+            self._store.append(key, {"total_tokens": total})
+        return CachedTokenCount(total)
+
+
+class _CachedCaches:
+    """
+    Cached contents recebem um nome estável derivado do conteúdo, para que as
+    chamadas que os referenciam tenham o mesmo hash entre execuções. O nome
+    real devolvido pela API fica em `aliases`. O resultado da criação
+    (aceito ou recusado) também é gravado, para o replay reproduzir o mesmo
+    caminho.
+    """
+
+    def __init__(self, live_caches, store: ResponseStore, mode: str, aliases: dict):
+        self._live = live_caches
+        self._store = store
+        self._mode = mode
+        self._aliases = aliases
+
+    def create(self, model, config):
+        key = request_key("caches.create", model, config.get("contents"))
+        alias = f"cachedContents/vexi-{key[:16]}"
+        samples = self._store.get(key)
+
+        if self._mode == "replay" or (self._mode == "auto" and samples and self._live is None):
+            if not samples:
+                raise KeyError(f"Cache creation {key[:12]} not recorded")
+            if samples[0]["error"]:
+                raise ValueError(samples[0]["error"])
+            return SimpleNamespace(name=alias)
+
+        if self._live is None:
+            raise KeyError(f"Cache creation {key[:12]} needs a live client")
+        try:
+            self._aliases[alias] = self._live.create(model=model, config=config).name
+            error = None
+        except Exception as e:
+            error = str(e)
+        if self._mode != "off" and not samples:
+            self._store.append(key, {"error": error})
+        if error is not None:
+            raise ValueError(error)
+        return SimpleNamespace(name=alias)
+
+    def delete(self, name):
+        real = self._aliases.pop(name, None)
+        if real is not None:
+            self._live.delete(name=real)
+
+
+class CachedClient:
+    """
+    Substituto de genai.Client para os benchmarks: expõe `models` e `caches`
+    com a mesma interface e registra a latência medida em `response.latency`.
+
+    `resample_cv`: no modo replay/auto, células cujo coeficiente de variação
+    da latência gravada excede esse valor são reamostradas ao vivo; as
+    novas amostras substituem as antigas no store.
+    """
+
+    def __init__(self, live_client=None, path: str = "llm_cache.jsonl", mode: str = "auto", resample_cv=None):
+        if mode not in MODES:
+            raise ValueError(f"Invalid cache mode {mode!r}, expected one of {MODES}")
+        self.store = ResponseStore(path)
+        aliases = {}
+        self.models = _CachedModels(
+            live_client.models if live_client is not None else None,
+            self.store,
+            mode,
+            resample_cv,
+            aliases,
+        )
+        self.caches = _CachedCaches(
+            live_client.caches if live_client is not None else None,
+            self.store,
+            mode,
+            aliases,
+        )
+
+
+def client_from_env(make_live_client) -> CachedClient:
+    """
+    Monta o CachedClient a partir de VEXI_CACHE_MODE, VEXI_CACHE_PATH e
+    VEXI_RESAMPLE_CV. O client ao vivo só é criado quando pode ser usado.
+    """
+    mode = os.getenv("VEXI_CACHE_MODE", "auto")
+    path = os.getenv("VEXI_CACHE_PATH", "llm_cache.jsonl")
+    resample_cv = float(os.getenv("VEXI_RESAMPLE_CV", "0")) or None
+
+    live = None if mode == "replay" and resample_cv is None else make_live_client()
+    return CachedClient(live, path, mode, resample_cv)
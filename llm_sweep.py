@@ -0,0 +1,151 @@
+# ============================================================
+# LLM SWEEP — MODELOS x TAMANHO DE CONTEXTO x CODIFICAÇÃO
+# Codificações: python, vvm e compact (bytecode binário em base64)
+# Uma tabela: tokens, time-to-first-token, latência e acurácia
+# ============================================================
+
+import argparse
+import base64
+import re
+
+import numpy as np
+
+from llm_backends import make_backend
+from prompt_cache import stub_answer
+from report_builder import SATURATION_COLUMNS, log_store_cell, run_id
+from results_log import ResultsLog
+from results_store import ResultsStore, exact_match
+
+ENCODINGS = ("python", "vvm", "compact")
+TARGET = "999"
+QUESTION = "Question: What is the value of the initial key? Answer only with the number."
+SET_KEY, UPDATE_INVENTORY = 100, 40
+
+COMPACT_RULES = "Rules: base64 of little-endian uint16 words; 100:SetKey, 40:UpdateInventory\n"
+COMPACT_BODY = re.compile(re.escape(COMPACT_RULES) + r"([A-Za-z0-9+/=]+)")
+# Maior n_ops cujos operandos (i e i*2) cabem numa palavra uint16
+COMPACT_MAX_OPS = np.iinfo("<u2").max // 2 + 1
+
+
+# ----------------------------
+# CONTEXTOS
+# ----------------------------
+def encode_context(n_ops: int, encoding: str = "python"):
+    """
+    Mesmo programa (chave inicial + n_ops atualizações de inventário) em cada
+    codificação. Retorna (prefixo estável, pergunta).
+    """
+    if encoding == "python":
+        ctx = f"initial_key = {TARGET}\n"
+        for i in range(n_ops):
+            ctx += f"item_{i} = {i} * 2\nupdate_inventory(item_{i})\n"
+        return f"{ctx}\n", QUESTION
+
+    if encoding == "vvm":
+        ctx = f"{SET_KEY} {TARGET} "
+        for i in range(n_ops):
+            ctx += f"{UPDATE_INVENTORY} {i} {i*2} "
+        rules = "Rules: 100:SetKey, 40:UpdateInventory\n"
+        return f"{rules}{ctx}\n\n", QUESTION
+
+    if encoding == "compact":
+        if n_ops > COMPACT_MAX_OPS:
+            raise ValueError(f"compact encoding supports at most {COMPACT_MAX_OPS} ops (uint16 words), got {n_ops}")
+        i = np.arange(n_ops)
+        words = np.empty(2 + 3 * n_ops, dtype="<u2")
+        words[:2] = SET_KEY, int(TARGET)
+        words[2::3], words[3::3], words[4::3] = UPDATE_INVENTORY, i, i * 2
+        return f"{COMPACT_RULES}{base64.b64encode(words.tobytes()).decode('ascii')}\n\n", QUESTION
+
+    raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def decode_answer(prompt: str) -> str:
+    """
+    Resposta correta para qualquer codificação: oráculo do FakeBackend.
+    """
+    match = COMPACT_BODY.search(prompt)
+    if match:
+        words = np.frombuffer(base64.b64decode(match.group(1)), dtype="<u2")
+        return str(words[1]) if len(words) > 1 and words[0] == SET_KEY else ""
+    return stub_answer(prompt)
+
+
+# ----------------------------
+# SWEEP
+# ----------------------------
+def run_sweep(backends, steps, encodings=ENCODINGS, repeats: int = 3, verbose: bool = True,
+              log: ResultsLog = None, run: str = None) -> ResultsStore:
+    """
+    Com `log` (SATURATION_COLUMNS), cada célula (modelo, codificação, ops) é
+    gravada assim que suas repetições terminam, sob o id `run`.
+    """
+    results = ResultsStore([b.name for b in backends], encodings, steps, repeats)
+    run = run or run_id()
+    for backend in backends:
+        for n in steps:
+            for encoding in encodings:
+                prefix, question = encode_context(n, encoding)
+                prompt = prefix + question
+                tokens = backend.count_tokens(prompt)
+                for r in range(repeats):
+                    c = backend.complete(prompt)
+                    results.record(backend.name, encoding, n, r, tokens=tokens, ttft=c.ttft,
+                                   latency=c.latency, acc=exact_match(c.text, TARGET))
+                if log is not None:
+                    log_store_cell(log, run, results, backend.name, encoding, n)
+                if verbose:
+                    cell = (results.models.index(backend.name), results.modes.index(encoding), results.steps.index(n))
+                    print(f"{backend.name} | {encoding} | ops {n} | tokens {tokens} | "
+                          f"lat {results.mean('latency')[cell]:.3f}s | acc {results.mean('acc')[cell]:.2f}")
+    return results
+
+
+def format_table(results: ResultsStore) -> str:
+    """
+    Uma linha por (modelo, codificação, ops). `vs py` é a razão de tokens
+    em relação à codificação python com o mesmo número de operações.
+    """
+    tokens, ttft = results.mean("tokens"), results.mean("ttft")
+    lat, lat_p95, acc = results.mean("latency"), results.percentile("latency", 95), results.mean("acc")
+    py = results.modes.index("python") if "python" in results.modes else None
+
+    header = f"{'modelo':<28} {'codificação':<9} {'ops':>6} {'tokens':>8} {'vs py':>6} " \
+             f"{'ttft (s)':>9} {'lat (s)':>8} {'p95 (s)':>8} {'acc':>5}"
+    lines = [header, "-" * len(header)]
+    for m, model in enumerate(results.models):
+        for s, n in enumerate(results.steps):
+            for e, encoding in enumerate(results.modes):
+                cell = (m, e, s)
+                ratio = tokens[cell] / tokens[m, py, s] if py is not None else np.nan
+                lines.append(
+                    f"{model:<28} {encoding:<9} {n:>6} {tokens[cell]:>8.0f} {ratio:>6.2f} "
+                    f"{ttft[cell]:>9.3f} {lat[cell]:>8.3f} {lat_p95[cell]:>8.3f} {acc[cell]:>5.2f}"
+                )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep de modelos x contexto x codificação.")
+    parser.add_argument("--models", nargs="+", default=["fake"],
+                        help='backends "provedor:modelo": gemini:…, openai:…, hf:…, fake')
+    parser.add_argument("--steps", nargs="+", type=int, default=[10, 100, 500, 1000])
+    parser.add_argument("--encodings", nargs="+", default=list(ENCODINGS), choices=ENCODINGS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", default="resultados_sweep.npz")
+    parser.add_argument("--log", default="resultados_sweep.log",
+                        help="log incremental; figura com: python report_builder.py saturacao <log>")
+    args = parser.parse_args()
+    if "compact" in args.encodings and max(args.steps) > COMPACT_MAX_OPS:
+        parser.error(f"compact encoding supports at most {COMPACT_MAX_OPS} ops (uint16 words)")
+
+    backends = [
+        make_backend(spec, oracle=decode_answer) if spec.startswith("fake") else make_backend(spec)
+        for spec in args.models
+    ]
+    results = run_sweep(backends, args.steps, args.encodings, args.repeats,
+                        log=ResultsLog(args.log, SATURATION_COLUMNS))
+    results.save(args.out)
+    print()
+    print(format_table(results))
+    print(f"\nResultados salvos em {args.out}")
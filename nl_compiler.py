@@ -0,0 +1,281 @@
+# ============================================================
+# NL COMPILER — LINGUAGEM NATURAL -> BYTECODE SEM LLM
+# Regras compiladas sobre as frases conhecidas (generate_sample), PT e EN
+# Frases reconhecidas são compiladas localmente em microssegundos;
+# só as demais vão para o LLM
+# ============================================================
+
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from vexi_isa import BY_OPCODE, COLORS, OPCODES, SHAPES, parse_program
+from vvm import validate_program
+
+# Nomes aceitos para cada valor (comparados sem acento e sem caixa)
+EN_SHAPES = {1: "circle", 2: "square", 3: "triangle"}
+EN_COLORS = {1: "red", 2: "blue", 3: "green"}
+
+SENTENCE = re.compile(r"(?<=[.!?;])\s+")
+
+
+def normalize(text: str) -> str:
+    """
+    Minúsculas, sem acentos, espaços colapsados e sem pontuação final.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split()).rstrip(".!?; ")
+
+
+def _names(pt: dict, en: dict) -> dict:
+    names = {normalize(name): v for v, (_, name) in pt.items()}
+    names.update({name: v for v, name in en.items()})
+    return names
+
+
+SHAPE_NAMES = _names(SHAPES, EN_SHAPES)
+COLOR_NAMES = _names(COLORS, EN_COLORS)
+_SHAPE = "(?P<shape>" + "|".join(map(re.escape, SHAPE_NAMES)) + ")"
+_COLOR = "(?P<color>" + "|".join(map(re.escape, COLOR_NAMES)) + ")"
+_XY = r"(?P<x>\d+),? (?:e |and )?(?P<y>\d+)"
+
+# (instrução, padrões). Os padrões casam a frase inteira já normalizada.
+RULES = (
+    ("SPAWN", (
+        rf"spawne uma entidade do tipo (?P<n>\d+)",
+        rf"(?:spawn|create) an? entity of type (?P<n>\d+)",
+    )),
+    ("MOVE", (
+        r"mova(?:-se)? para x=(?P<x>\d+),? y=(?P<y>\d+)",
+        rf"va para a posicao {_XY}",
+        rf"desloque-se ate {_XY}",
+        r"move to x=(?P<x>\d+),? y=(?P<y>\d+)",
+        rf"(?:go|move) to (?:the )?position {_XY}",
+    )),
+    ("SET_COLOR", (
+        rf"mude a cor para {_COLOR}",
+        rf"fique {_COLOR}(?: \(id (?P<id>\d+)\))?",
+        rf"defina a cor como {_COLOR}",
+        rf"(?:change|set) (?:the )?colou?r to {_COLOR}",
+        rf"turn {_COLOR}",
+    )),
+    ("SET_SHAPE", (
+        rf"transforme-se em um {_SHAPE}",
+        rf"(?:transform|turn) into an? {_SHAPE}",
+        rf"become an? {_SHAPE}",
+    )),
+    ("SET_SPEED", (
+        r"ajuste (?:a )?velocidade para (?P<n>\d+)",
+        r"set (?:the )?speed to (?P<n>\d+)",
+    )),
+    ("ROTATE", (
+        r"gire (?P<n>\d+) graus",
+        r"(?:rotate|turn) (?P<n>\d+) degrees",
+    )),
+    ("SEEK", (
+        rf"busque o alvo em {_XY}",
+        rf"seek (?:the )?target at {_XY}",
+    )),
+    ("CONSUME", (
+        r"execute consumir",
+        r"consuma",
+        r"execute consume",
+        r"consume",
+    )),
+)
+
+
+def _emit(name: str, m: re.Match):
+    g = m.groupdict()
+    opcode = OPCODES[name]
+    if g.get("x") is not None:
+        return [opcode, int(g["x"]), int(g["y"])]
+    if g.get("color") is not None:
+        color = COLOR_NAMES[g["color"]]
+        if g.get("id") is not None and int(g["id"]) != color:
+            return None  # nome e ID discordam: deixa para o LLM
+        return [opcode, color]
+    if g.get("shape") is not None:
+        return [opcode, SHAPE_NAMES[g["shape"]]]
+    if g.get("n") is not None:
+        return [opcode, int(g["n"])]
+    return [opcode]
+
+
+# Início de um padrão: uma palavra literal ou uma alternância de palavras,
+# opcionalmente seguida de um sufixo literal opcional, e depois espaço ou fim.
+_HEAD = re.compile(r"(?:\(\?:(?P<alts>[\w|-]+)\)|(?P<word>[\w-]+))(?:\(\?:(?P<opt>[\w-]+)\)\?)?(?= |$)")
+
+
+def pattern_heads(pattern: str) -> list:
+    """
+    Todas as primeiras palavras que `pattern` aceita. Um início fora da
+    forma de _HEAD levanta ValueError, em vez de deixar a regra
+    inalcançável pelo índice.
+    """
+    m = _HEAD.match(pattern)
+    if m is None:
+        raise ValueError(f"Pattern head not indexable: {pattern!r}")
+    heads = m["alts"].split("|") if m["alts"] else [m["word"]]
+    if m["opt"]:
+        heads += [head + m["opt"] for head in heads]
+    head = re.compile(pattern[:m.end()])
+    if not all(head.fullmatch(h) for h in heads):
+        raise ValueError(f"Pattern head not indexable: {pattern!r}")
+    return heads
+
+
+def _in_range(code) -> bool:
+    operands = BY_OPCODE[code[0]].operands
+    return all(op.lo <= v <= op.hi for op, v in zip(operands, code[1:]))
+
+
+class RuleCompiler:
+    """
+    Os padrões são indexados pela primeira palavra (um trie de um nível):
+    cada frase só testa as poucas regras que começam como ela. Cada padrão
+    entra sob todas as primeiras palavras que aceita (pattern_heads).
+    """
+
+    def __init__(self, rules=RULES):
+        self.rules = rules
+        self.index = {}
+        for name, patterns in rules:
+            for pattern in patterns:
+                for head in pattern_heads(pattern):
+                    self.index.setdefault(head, []).append((name, re.compile(pattern)))
+
+    def unreachable(self, sentence: str) -> bool:
+        """
+        True se alguma regra casa a frase mas o índice não a leva até ela.
+        """
+        text = normalize(sentence)
+        indexed = {p.pattern for _, p in self.index.get(text.split(" ", 1)[0], ())}
+        return any(re.fullmatch(p, text) and p not in indexed
+                   for _, patterns in self.rules for p in patterns)
+
+    def compile_sentence(self, sentence: str):
+        """
+        Bytecode (lista de inteiros) de uma frase, ou None se não reconhecida
+        ou fora da faixa da ISA.
+        """
+        text = normalize(sentence)
+        for name, pattern in self.index.get(text.split(" ", 1)[0], ()):
+            m = pattern.fullmatch(text)
+            if m:
+                code = _emit(name, m)
+                if code is not None and _in_range(code):
+                    return code
+                return None
+        return None
+
+
+@dataclass
+class CompileResult:
+    bytecode: str
+    hits: int                     # frases compiladas localmente
+    misses: list = field(default_factory=list)   # frases enviadas ao LLM
+    valid: bool = True
+
+    @property
+    def local(self) -> bool:
+        return not self.misses
+
+
+RULE_COMPILER = RuleCompiler()
+
+
+def compile_behavior(text: str, fallback=None, compiler: RuleCompiler = RULE_COMPILER) -> CompileResult:
+    """
+    Compila `text` frase a frase. Frases não reconhecidas vão para
+    `fallback(frase) -> bytecode em texto` (o LLM); sem fallback, ficam de
+    fora e o resultado é marcado como inválido.
+    """
+    parts, hits, misses, valid = [], 0, [], True
+    for sentence in SENTENCE.split(text.strip()):
+        if not sentence:
+            continue
+        code = compiler.compile_sentence(sentence)
+        if code is not None:
+            parts.append(" ".join(map(str, code)))
+            hits += 1
+            continue
+        misses.append(sentence)
+        if fallback is None:
+            valid = False
+        else:
+            parts.append(fallback(sentence).strip())
+
+    bytecode = " ".join(p for p in parts if p)
+    # O que foi compilado localmente já está na faixa da ISA; só o que veio
+    # do LLM precisa do validador.
+    if valid and misses:
+        try:
+            valid = validate_program(parse_program(bytecode)) == -1
+        except (ValueError, OverflowError):
+            valid = False
+    return CompileResult(bytecode, hits, misses, valid)
+
+
+def llm_fallback(backend, system_rules: str):
+    """
+    Fallback que compila uma frase com um llm_backends.Backend, sem
+    histórico: o prompt é sempre regras + frase.
+    """
+    def compile_with_llm(sentence: str) -> str:
+        return backend.complete(f"{system_rules}\nTask: {sentence}\nBytecode:").text
+    return compile_with_llm
+
+
+# ----------------------------
+# RELATÓRIO — dataset.jsonl
+# ----------------------------
+if __name__ == "__main__":
+    import json
+
+    prompts, expected = [], []
+    with open("dataset.jsonl", encoding="utf-8") as f:
+        for line in f:
+            messages = {m["role"]: m["content"] for m in json.loads(line)["messages"]}
+            prompts.append(messages["user"])
+            expected.append(messages["model"])
+
+    times, results = [], []
+    for text in prompts:
+        start = time.perf_counter()
+        results.append(compile_behavior(text))
+        times.append(time.perf_counter() - start)
+    times = np.array(times) * 1e6
+
+    sentences = sum(r.hits + len(r.misses) for r in results)
+    hits = sum(r.hits for r in results)
+    local = sum(r.local for r in results)
+    correct = sum(r.local and r.bytecode == e for r, e in zip(results, expected))
+
+    print(f"Prompts: {len(prompts)} | Frases: {sentences}")
+    print(f"Frases reconhecidas: {hits}/{sentences} ({hits / sentences:.1%})")
+    print(f"Prompts 100% locais: {local}/{len(prompts)} ({local / len(prompts):.1%}) | "
+          f"Bytecode idêntico ao dataset: {correct}/{local}")
+    print(f"Latência por prompt: média {times.mean():.1f} µs | p50 {np.median(times):.1f} µs | "
+          f"p99 {np.percentile(times, 99):.1f} µs")
+
+    misses = [s for r in results for s in r.misses]
+    for s in misses[:10]:
+        print(f"  não reconhecida: {s}")
+    unreachable = [s for text in prompts for s in SENTENCE.split(text.strip()) if RULE_COMPILER.unreachable(s)]
+    print(f"Frases aceitas por uma regra mas fora do índice: {len(unreachable)}")
+    for s in unreachable[:10]:
+        print(f"  fora do índice: {s}")
+
+    examples = [
+        ("EN", "Spawn an entity of type 2. Set speed to 5. Move to x=10, y=20. Rotate 90 degrees."),
+        ("EN", "Turn blue. Become a triangle. Seek the target at 50, 50. Consume."),
+        ("PT", "Mova-se para x=50, y=50. Mova para x=10, y=20. Gire 90 graus."),
+    ]
+    for lang, text in examples:
+        r = compile_behavior(text)
+        print(f"{lang}: {text} -> {r.bytecode} ({r.hits} locais, {len(r.misses)} para o LLM)")
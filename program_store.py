@@ -0,0 +1,92 @@
+# ============================================================
+# PROGRAM STORE — CORPUS DE BYTECODE EM DISCO (np.memmap)
+# instructions.bin: todos os tokens, contíguos (int16 ou int32)
+# offsets.bin:      int64, programa i = [offsets[i], offsets[i+1])
+# meta.json:        dtype das instruções
+# ============================================================
+
+import json
+import os
+
+import numpy as np
+
+DTYPES = {"int16": np.int16, "int32": np.int32}
+
+
+class ProgramStore:
+    """
+    Abrir o store só mapeia os arquivos (nada é lido até ser acessado), então
+    a abertura é instantânea para qualquer tamanho e o RSS acompanha apenas
+    as páginas efetivamente tocadas. `append` escreve no fim dos arquivos,
+    sem reescrever o que já existe; as instruções são gravadas antes dos
+    offsets, então um append interrompido nunca expõe programas parciais.
+    """
+
+    def __init__(self, path: str, dtype: str = "int32"):
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                dtype = json.load(f)["dtype"]
+        else:
+            os.makedirs(path, exist_ok=True)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dtype": dtype}, f)
+            np.zeros(1, dtype=np.int64).tofile(self._offsets_path)
+            open(self._instructions_path, "wb").close()
+
+        self.dtype = DTYPES[dtype]
+        self._map()
+
+    @property
+    def _instructions_path(self):
+        return os.path.join(self.path, "instructions.bin")
+
+    @property
+    def _offsets_path(self):
+        return os.path.join(self.path, "offsets.bin")
+
+    def _map(self):
+        self.offsets = np.asarray(np.memmap(self._offsets_path, dtype=np.int64, mode="r"))
+        n_tokens = int(self.offsets[-1])
+        if n_tokens == 0:
+            self.flat = np.empty(0, dtype=self.dtype)
+        else:
+            # Só o trecho coberto pelos offsets (ignora cauda de append interrompido)
+            self.flat = np.asarray(np.memmap(self._instructions_path, dtype=self.dtype, mode="r", shape=(n_tokens,)))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.flat[self.offsets[i]:self.offsets[i+1]]
+
+    def append(self, flat, offsets):
+        """
+        Acrescenta programas no formato empacotado (flat + offsets começando
+        em 0) ao fim do store.
+        """
+        flat = np.asarray(flat)
+        info = np.iinfo(self.dtype)
+        if len(flat) and (flat.min() < info.min or flat.max() > info.max):
+            raise ValueError(f"Token out of range for {np.dtype(self.dtype).name}")
+
+        base = int(self.offsets[-1])
+        with open(self._instructions_path, "r+b") as f:
+            f.seek(base * np.dtype(self.dtype).itemsize)
+            flat.astype(self.dtype).tofile(f)
+        with open(self._offsets_path, "ab") as f:
+            (np.asarray(offsets[1:], dtype=np.int64) + base).tofile(f)
+
+        self._map()
+
+    def chunks(self, programs_per_chunk: int = 1_000_000):
+        """
+        Itera em (flat, offsets) de até `programs_per_chunk` programas, com
+        offsets rebaseados para 0. `flat` é uma view do memmap (sem cópia).
+        """
+        for start in range(0, len(self), programs_per_chunk):
+            stop = min(start + programs_per_chunk, len(self))
+            offsets = self.offsets[start:stop + 1]
+            yield self.flat[offsets[0]:offsets[-1]], offsets - offsets[0]
@@ -0,0 +1,153 @@
+# ============================================================
+# PROMPT PREFIX CACHE — Gemini cached content
+# Prefixo estável (regras + contexto) em cache, pergunta como sufixo
+# Mede tokens em cache, latência e custo reais
+# ============================================================
+
+import hashlib
+import json
+import os
+import re
+from types import SimpleNamespace
+
+CACHE_TTL = "900s"
+CACHE_STATS_FILE = "cache_stats.json"
+
+
+# ----------------------------
+# HANDLES DE CACHE
+# ----------------------------
+class PrefixCache:
+    """
+    Cria um cached content por prefixo distinto e reutiliza o handle nas
+    chamadas seguintes. Prefixos que a API recusa (por exemplo, abaixo do
+    mínimo de tokens do modelo) ficam marcados como não-cacheáveis e seguem
+    pelo caminho sem cache.
+    """
+
+    def __init__(self, client, model: str, ttl: str = CACHE_TTL):
+        self.client = client
+        self.model = model
+        self.ttl = ttl
+        self._handles = {}
+
+    def handle(self, prefix: str):
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        if key not in self._handles:
+            try:
+                cache = self.client.caches.create(
+                    model=self.model,
+                    config={"contents": [prefix], "ttl": self.ttl},
+                )
+                self._handles[key] = cache.name
+            except Exception as e:
+                print(f"[cache] prefixo não cacheável ({len(prefix)} chars): {e}")
+                self._handles[key] = None
+        return self._handles[key]
+
+    def close(self):
+        for name in self._handles.values():
+            if name is not None:
+                self.client.caches.delete(name=name)
+        self._handles.clear()
+
+
+def generate(client, model: str, prefix: str, question: str, cache: PrefixCache = None):
+    """
+    Envia prefixo + pergunta. Com `cache`, o prefixo vai como cached content e
+    só a pergunta é enviada como conteúdo novo.
+    """
+    name = cache.handle(prefix) if cache is not None else None
+    if name is None:
+        return client.models.generate_content(model=model, contents=prefix + question)
+    return client.models.generate_content(
+        model=model,
+        contents=question,
+        config={"cached_content": name},
+    )
+
+
+# ----------------------------
+# CUSTO (USD por 1M tokens)
+# ----------------------------
+def prompt_cost(usage, price_input: float, price_cached: float) -> float:
+    prompt = getattr(usage, "prompt_token_count", None) or 0
+    cached = getattr(usage, "cached_content_token_count", None) or 0
+    return ((prompt - cached) * price_input + cached * price_cached) / 1_000_000
+
+
+def save_cache_stats(cached_tokens: float, prompt_tokens: float, path: str = CACHE_STATS_FILE, **extra):
+    stats = {
+        "cache_ratio": cached_tokens / prompt_tokens if prompt_tokens else 0.0,
+        "cached_tokens": cached_tokens,
+        "prompt_tokens": prompt_tokens,
+        **extra,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+def load_cache_ratio(default: float, path: str = CACHE_STATS_FILE) -> float:
+    """
+    Fração de tokens de entrada servida do cache, medida pelo benchmark de
+    saturação. Sem medição disponível, retorna `default`.
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["cache_ratio"]
+
+
+# ----------------------------
+# STUB LOCAL (sem rede)
+# ----------------------------
+# Oráculo dos clientes offline (StubClient, llm_backends.FakeBackend): o
+# primeiro valor atribuído à chave inicial (python ou opcode 100).
+STUB_ANSWER = re.compile(r"(?:initial_key = |\b100 )(\d+)")
+
+
+def stub_answer(text: str) -> str:
+    match = STUB_ANSWER.search(text)
+    return match.group(1) if match else ""
+
+
+class StubClient:
+    """
+    Imita client.models / client.caches do genai para testar o fluxo de cache
+    offline. Tokens são contados por palavra; a resposta vem de stub_answer.
+    """
+
+    def __init__(self, min_cache_tokens: int = 0):
+        self.min_cache_tokens = min_cache_tokens
+        self.cached = {}
+        self.models = SimpleNamespace(generate_content=self._generate, count_tokens=self._count)
+        self.caches = SimpleNamespace(create=self._create, delete=self._delete)
+
+    @staticmethod
+    def _tokens(text: str) -> int:
+        return len(text.split())
+
+    def _count(self, model, contents, config=None):
+        return SimpleNamespace(total_tokens=self._tokens(contents))
+
+    def _create(self, model, config):
+        prefix = "".join(config["contents"])
+        if self._tokens(prefix) < self.min_cache_tokens:
+            raise ValueError(f"Cached content is too small: min {self.min_cache_tokens} tokens")
+        name = f"cachedContents/stub-{len(self.cached)}"
+        self.cached[name] = prefix
+        return SimpleNamespace(name=name)
+
+    def _delete(self, name):
+        del self.cached[name]
+
+    def _generate(self, model, contents, config=None):
+        prefix = self.cached[config["cached_content"]] if config and "cached_content" in config else ""
+        cached = self._tokens(prefix)
+        usage = SimpleNamespace(
+            prompt_token_count=cached + self._tokens(contents),
+            cached_content_token_count=cached,
+            candidates_token_count=1,
+        )
+        return SimpleNamespace(text=stub_answer(prefix + contents), usage_metadata=usage)
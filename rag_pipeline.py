@@ -0,0 +1,209 @@
+# ============================================================
+# RAG PIPELINE — OTIMIZADO
+# Chunking + Embedding em lotes (multi-thread) + Índice IP + Busca
+# Cada estágio é cronometrado separadamente
+# ============================================================
+
+import ast
+import copy
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import faiss
+import numpy as np
+
+from vexi_isa import ARITY, BY_OPCODE
+
+BATCH_CANDIDATES = (16, 32, 64, 128, 256)
+TUNE_REPEATS = 3
+LEGEND_ENTRY = re.compile(r"(\d+):(\w+)")
+
+
+# ----------------------------
+# TEMPOS POR ESTÁGIO
+# ----------------------------
+@dataclass
+class RagTimings:
+    chunking: float = 0.0
+    embedding: float = 0.0
+    indexing: float = 0.0
+    search: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.chunking + self.embedding + self.indexing + self.search
+
+
+# ----------------------------
+# CHUNKING
+# ----------------------------
+def chunk_lines(context: str) -> list:
+    """
+    Divide o contexto por linha, descartando linhas vazias.
+    """
+    return [line for line in context.split("\n") if line.strip()]
+
+
+def chunk_python(context: str, statements: int = 1) -> list:
+    """
+    Divide código Python em fronteiras de statement (via ast), agrupando
+    `statements` statements de topo por chunk. Se o contexto não for Python
+    válido, cai para a divisão por linha.
+    """
+    try:
+        body = ast.parse(context).body
+    except SyntaxError:
+        return chunk_lines(context)
+
+    lines = context.split("\n")
+    chunks = []
+    for i in range(0, len(body), statements):
+        group = body[i:i + statements]
+        start, end = group[0].lineno - 1, group[-1].end_lineno
+        chunks.append("\n".join(lines[start:end]))
+    return chunks
+
+
+def parse_legend(header: str) -> dict:
+    """
+    Lê um cabeçalho no formato "Rules: 100:SetKey, 40:UpdateInv" em {opcode: nome}.
+    """
+    return {int(op): name for op, name in LEGEND_ENTRY.findall(header)}
+
+
+def chunk_vvm(context: str, arity: dict = ARITY, window: int = 16) -> list:
+    """
+    Divide bytecode VVM em janelas de `window` instruções completas (nunca
+    separa um opcode dos seus operandos). Cada chunk recebe um cabeçalho com a
+    legenda apenas dos opcodes que aparecem nele. Por padrão usa a aridade
+    da ISA da VVM.
+    """
+    header, _, body = context.partition("\n")
+    if not header.startswith("Rules:"):
+        header, body = "", context
+    legend = {op: ins.label for op, ins in BY_OPCODE.items()}
+    legend.update(parse_legend(header))
+
+    tokens = body.split()
+    chunks, window_tokens, used, count = [], [], {}, 0
+    ip = 0
+    while ip < len(tokens):
+        opcode = int(tokens[ip])
+        if opcode not in arity:
+            raise ValueError(f"Invalid opcode {opcode} at token {ip}")
+        size = 1 + arity[opcode]
+        if ip + size > len(tokens):
+            raise ValueError(f"Truncated instruction {opcode} at token {ip}: "
+                             f"expected {arity[opcode]} operands, got {len(tokens) - ip - 1}")
+        window_tokens.extend(tokens[ip:ip + size])
+        used[opcode] = legend.get(opcode, str(opcode))
+        ip += size
+        count += 1
+
+        if count == window or ip >= len(tokens):
+            rules = ", ".join(f"{op}:{name}" for op, name in used.items())
+            chunks.append(f"Rules: {rules}\n{' '.join(window_tokens)}")
+            window_tokens, used, count = [], {}, 0
+
+    return chunks
+
+
+# ----------------------------
+# PIPELINE
+# ----------------------------
+class RagPipeline:
+    """
+    Encapsula o modelo de embedding e um pool de threads reutilizado entre
+    chamadas. A query é codificada no mesmo passe que os chunks e os vetores
+    são normalizados, então a busca por produto interno equivale ao cosseno.
+
+    O tokenizador rápido do HF não pode ser usado por várias threads ao mesmo
+    tempo ("Already borrowed"), então cada worker tem sua própria cópia do
+    modelo e só ela é chamada daquela thread.
+    """
+
+    def __init__(self, embedding_model, batch_size: int = 64, workers: int = 4):
+        self.model = embedding_model
+        self.batch_size = batch_size
+        self.workers = workers
+        self._models = [embedding_model] + [copy.deepcopy(embedding_model) for _ in range(workers - 1)]
+        self._pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _encode_batches(self, worker: int, batches):
+        model = self._models[worker]
+        return [
+            model.encode(b, batch_size=len(b), convert_to_numpy=True, normalize_embeddings=True)
+            for b in batches
+        ]
+
+    def embed(self, texts: list) -> np.ndarray:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self._pool is None or len(batches) == 1:
+            parts = self._encode_batches(0, batches)
+        else:
+            # Worker w codifica os lotes w, w + workers, ... com o seu modelo
+            workers = min(self.workers, len(batches))
+            groups = list(self._pool.map(self._encode_batches, range(workers),
+                                         [batches[w::workers] for w in range(workers)]))
+            parts = [None] * len(batches)
+            for w, group in enumerate(groups):
+                parts[w::workers] = group
+
+        # O encode já devolve vetores unitários (normalize_embeddings=True)
+        return np.ascontiguousarray(np.vstack(parts), dtype=np.float32)
+
+    def tune_batch_size(self, sample_texts: list, candidates=BATCH_CANDIDATES,
+                        repeats: int = TUNE_REPEATS) -> int:
+        """
+        Mede a vazão (textos/s) de cada tamanho de lote e fixa o melhor. Cada
+        tamanho é medido `repeats` vezes e vale o melhor tempo, para que uma
+        medição ruidosa não decida sozinha.
+        """
+        self.embed(sample_texts[:min(len(sample_texts), 8)])  # warmup
+
+        best, best_rate = self.batch_size, 0.0
+        for size in candidates:
+            self.batch_size = size
+            elapsed = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                self.embed(sample_texts)
+                elapsed.append(time.perf_counter() - start)
+            rate = len(sample_texts) / min(elapsed)
+            if rate > best_rate:
+                best, best_rate = size, rate
+
+        self.batch_size = best
+        return best
+
+    def run(self, context: str, query: str, k: int = 2, chunker=chunk_lines):
+        timings = RagTimings()
+
+        t0 = time.perf_counter()
+        chunks = chunker(context)
+        timings.chunking = time.perf_counter() - t0
+        if not chunks:
+            return "", timings  # contexto vazio: nada a indexar
+
+        t0 = time.perf_counter()
+        emb = self.embed([query] + chunks)
+        timings.embedding = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = faiss.IndexFlatIP(emb.shape[1])
+        index.add(emb[1:])
+        timings.indexing = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        _, I = index.search(emb[:1], k=min(k, len(chunks)))
+        timings.search = time.perf_counter() - t0
+
+        retrieved = "\n".join(chunks[i] for i in I[0] if i >= 0)
+        return retrieved, timings
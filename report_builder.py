@@ -0,0 +1,308 @@
+# ============================================================
+# REPORT BUILDER — FIGURAS A PARTIR DO LOG COLUNAR, SEM JANELA
+# Renderiza com o backend Agg (headless) a qualquer momento do benchmark
+# Agregação vetorizada e downsampling min/max para milhões de pontos
+# ============================================================
+
+import argparse
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from numba import njit
+
+from results_log import STR, ResultsLog
+from results_store import METRICS, ResultsStore
+
+# Esquemas dos logs dos benchmarks
+SATURATION_COLUMNS = {
+    "run": STR, "model": STR, "mode": STR, "step": "int64", "repeat": "int64",
+    **{name: "float64" for name in METRICS},
+}
+SCALABILITY_COLUMNS = {
+    "run": STR, "series": STR, "n": "int64", "tokens": "float64", "time": "float64", "cost": "float64",
+}
+RAG_STAGES = ("chunking", "embedding", "indexing", "search")
+RAG_COLUMNS = {
+    "run": STR, "mode": STR, "step": "int64", "repeat": "int64",
+    "latency": "float64", "tokens": "float64", "acc": "float64",
+    **{stage: "float64" for stage in RAG_STAGES},
+}
+RAG_LABELS = {"python": "Python", "vvm": "VVM", "rag": "RAG", "rag_vvm": "RAG-VVM"}
+
+MAX_POINTS = 4000
+
+
+def run_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+def log_store_cell(log: ResultsLog, run: str, results: ResultsStore, model: str, mode: str, step):
+    """
+    Acrescenta ao log (SATURATION_COLUMNS) as repetições de uma célula já
+    preenchida do ResultsStore.
+    """
+    cell = (results.models.index(model), results.modes.index(mode), results.steps.index(step))
+    log.append(run=run, model=model, mode=mode, step=step, repeat=np.arange(results.repeats),
+               **{name: results.metric(name)[cell] for name in METRICS})
+
+
+def latest_run(columns: dict) -> dict:
+    """
+    Só as linhas da execução mais recente (ids de run ordenáveis por data).
+    """
+    if not len(columns["run"]):
+        return columns
+    keep = columns["run"] == max(columns["run"])
+    return {name: values[keep] for name, values in columns.items()}
+
+
+# ----------------------------
+# DOWNSAMPLING
+# ----------------------------
+@njit
+def _minmax_indices(y, n_bins):
+    # Índices do mínimo e do máximo de cada bloco, na ordem original:
+    # preserva picos e vales da curva com 2 pontos por bloco.
+    n = len(y)
+    out = np.empty(2 * n_bins, dtype=np.int64)
+    k = 0
+    for b in range(n_bins):
+        lo, hi = b * n // n_bins, (b + 1) * n // n_bins
+        if hi <= lo:
+            continue
+        i_min, i_max = lo, lo
+        for i in range(lo, hi):
+            if y[i] < y[i_min]:
+                i_min = i
+            if y[i] > y[i_max]:
+                i_max = i
+        out[k], out[k + 1] = min(i_min, i_max), max(i_min, i_max)
+        k += 2
+    return out[:k]
+
+
+def downsample(x, y, max_points: int = MAX_POINTS):
+    """
+    Reduz (x, y) a no máximo `max_points` pontos mantendo mínimos e máximos
+    locais. `x` deve estar ordenado.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if len(y) <= max_points:
+        return x, y
+    idx = _minmax_indices(y, max_points // 2)
+    return x[idx], y[idx]
+
+
+# ----------------------------
+# AGREGAÇÃO
+# ----------------------------
+def _first_seen(values):
+    # Como np.unique, mas na ordem em que os valores aparecem no log.
+    uniq, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return uniq[order], rank[inverse.reshape(-1)]
+
+
+def store_from_log(columns: dict) -> ResultsStore:
+    """
+    Colunas de um log SATURATION_COLUMNS -> ResultsStore (denso).
+    """
+    models, model = _first_seen(columns["model"])
+    modes, mode = _first_seen(columns["mode"])
+    steps, step = np.unique(columns["step"], return_inverse=True)
+    repeats = int(columns["repeat"].max()) + 1 if len(columns["repeat"]) else 1
+
+    store = ResultsStore(models.tolist(), modes.tolist(), steps.tolist(), repeats)
+    for i, name in enumerate(METRICS):
+        store.data[i, model, mode, step, columns["repeat"]] = columns[name]
+    return store
+
+
+def group_mean(keys, values):
+    """
+    Média de `values` por combinação de `keys` (arrays paralelos), via
+    bincount: O(n). Retorna (chaves únicas, médias).
+    """
+    uniq, inverse = np.unique(np.stack([np.asarray(k) for k in keys]), axis=1, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    sums = np.bincount(inverse, weights=values)
+    counts = np.bincount(inverse)
+    return uniq, sums / counts
+
+
+def _save(fig: Figure, path: str, dpi: int):
+    FigureCanvasAgg(fig)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+
+
+# ----------------------------
+# FIGURAS
+# ----------------------------
+def saturation_figure(results: ResultsStore, path: str = "grafico_saturacao.png", dpi: int = 150):
+    """
+    Tokens, latência, acurácia (IC 95% via bootstrap) e custo por número de
+    operações, uma curva por modelo/modo (painéis de saturacao_context.py).
+    """
+    ops = np.array(results.steps)
+    fig = Figure(figsize=(28, 6))
+    axes = fig.subplots(1, 4)
+
+    token_mean, token_std = results.mean("tokens"), results.std("tokens")
+    lat_mean, lat_std = results.mean("latency"), results.std("latency")
+    acc_mean, acc_ci = results.mean("acc"), results.bootstrap_ci("acc")
+    cost_mean = results.mean("cost")
+
+    for m, model in enumerate(results.models):
+        for i, mode in enumerate(results.modes):
+            label = mode.upper() if len(results.models) == 1 else f"{model} / {mode.upper()}"
+            axes[0].errorbar(ops, token_mean[m, i], yerr=token_std[m, i], label=label, marker='o', capsize=5)
+            axes[1].errorbar(ops, lat_mean[m, i], yerr=lat_std[m, i], label=label, marker='s', capsize=5)
+            axes[2].plot(ops, acc_mean[m, i], label=label, marker='d')
+            axes[2].fill_between(ops, acc_ci[m, i, :, 0], acc_ci[m, i, :, 1], alpha=0.2)
+            axes[3].plot(ops, cost_mean[m, i] * 1_000_000, label=label, marker='^')
+
+    titles = ("Consumo Médio de Tokens", "Latência Média de Inferência",
+              "Fidelidade da Resposta", "Custo por 1M Requisições (USD)")
+    ylabels = ("Tokens", "Segundos", "Acurácia Média", "USD")
+    for ax, title, ylabel in zip(axes, titles, ylabels):
+        ax.set_title(title)
+        ax.set_xlabel("Número de Operações")
+        ax.set_ylabel(ylabel)
+        ax.legend()
+    axes[2].set_ylim(-0.05, 1.05)
+
+    _save(fig, path, dpi)
+
+
+def scalability_figure(columns: dict, path: str = "benchmark_escalabilidade.png", dpi: int = 150,
+                       title: str = "VVM Realtime Benchmark — Semantic Equivalence (Numba + NumPy)",
+                       cost_model: str = "GPT-5.2"):
+    """
+    Tokens, tempo e custo por escala (log-log), uma curva por série
+    (painéis de benchmark_llm_language_v3.py). Repetições de um mesmo n
+    são promediadas. `cost_model` é o modelo de preço usado na coluna cost.
+    """
+    fig = Figure(figsize=(20, 6))
+    axes = fig.subplots(1, 3)
+    series = np.unique(columns["series"])
+
+    for ax, metric, name in zip(axes, ("tokens", "time", "cost"),
+                                ("Tokens vs Scale", "Execution Time vs Scale",
+                                 f"Cost vs Scale ({cost_model})" if cost_model else "Cost vs Scale")):
+        for s in series:
+            sel = columns["series"] == s
+            (n,), mean = group_mean([columns["n"][sel]], columns[metric][sel])
+            ax.plot(*downsample(n, mean), marker="o" if len(n) <= 50 else None, label=s)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_title(name)
+        ax.legend()
+        ax.grid(True)
+
+    fig.suptitle(title)
+    _save(fig, path, dpi)
+
+
+def rag_figure(columns: dict, path: str = "benchmark_mestrado_final.png", dpi: int = 100):
+    """
+    Latência, tokens e acurácia médios (± desvio) por modo e o overhead do
+    RAG por estágio, empilhado em ms (painéis de saturacao_context_rag.py).
+    """
+    fig = Figure(figsize=(26, 6))
+    ax = fig.subplots(1, 4)
+    modes, mode = _first_seen(columns["mode"])
+    counts = np.bincount(mode, minlength=len(modes))
+
+    for i, (metric, name) in enumerate((("latency", "LAT"), ("tokens", "TOK"), ("acc", "ACC"))):
+        values = columns[metric]
+        means = np.bincount(mode, weights=values, minlength=len(modes)) / counts
+        stds = np.sqrt(np.maximum(np.bincount(mode, weights=values ** 2, minlength=len(modes)) / counts
+                                  - means ** 2, 0))
+        ax[i].bar([RAG_LABELS.get(m, m) for m in modes], means, yerr=stds, capsize=5)
+        ax[i].set_title(name)
+
+    # Só os modos com RAG têm tempos de estágio (NaN nos demais)
+    rag = ~np.isnan(columns[RAG_STAGES[0]])
+    rag_modes, rag_mode = _first_seen(columns["mode"][rag])
+    rag_counts = np.bincount(rag_mode, minlength=len(rag_modes))
+    bottom = np.zeros(len(rag_modes))
+    for stage in RAG_STAGES:
+        stage_ms = np.bincount(rag_mode, weights=columns[stage][rag], minlength=len(rag_modes)) / rag_counts * 1000
+        ax[3].bar([RAG_LABELS.get(m, m) for m in rag_modes], stage_ms, bottom=bottom, label=stage)
+        bottom += stage_ms
+    ax[3].set_title("RAG OVERHEAD (ms)")
+    ax[3].legend()
+
+    _save(fig, path, dpi)
+
+
+def series_figure(columns: dict, x: str, y: str, by: str = None, path: str = "serie.png",
+                  dpi: int = 150, max_points: int = MAX_POINTS):
+    """
+    Curva bruta de `y` por `x` (uma por valor de `by`), com downsampling
+    min/max: milhões de linhas do log viram alguns milhares de pontos.
+    """
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    groups = np.unique(columns[by]) if by else [None]
+    for g in groups:
+        sel = columns[by] == g if by else slice(None)
+        xs, ys = np.asarray(columns[x][sel]), np.asarray(columns[y][sel])
+        order = np.argsort(xs, kind="stable")
+        ax.plot(*downsample(xs[order], ys[order], max_points), label=str(g) if by else y, linewidth=0.8)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.legend()
+    ax.grid(True)
+    _save(fig, path, dpi)
+
+
+def build(kind: str, log_path: str, out: str, all_runs: bool = False, **kwargs) -> int:
+    """
+    Renderiza a figura `kind` com as linhas já confirmadas do log e retorna
+    quantas foram usadas (0: nada para desenhar ainda).
+    """
+    columns = ResultsLog(log_path).read()
+    if not all_runs and "run" in columns:
+        columns = latest_run(columns)
+    rows = len(next(iter(columns.values())))
+    if not rows:
+        return 0
+    if kind == "saturacao":
+        saturation_figure(store_from_log(columns), out)
+    elif kind == "escalabilidade":
+        scalability_figure(columns, out)
+    elif kind == "rag":
+        rag_figure(columns, out)
+    else:
+        series_figure(columns, kwargs["x"], kwargs["y"], kwargs.get("by"), out)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera figuras a partir de um log de resultados (sem janela).")
+    parser.add_argument("kind", choices=["saturacao", "escalabilidade", "rag", "serie"])
+    parser.add_argument("log", help="diretório do ResultsLog")
+    parser.add_argument("--out", help="arquivo da figura (padrão: <kind>.png)")
+    parser.add_argument("--x", help="coluna do eixo x (serie)")
+    parser.add_argument("--y", help="coluna do eixo y (serie)")
+    parser.add_argument("--by", help="uma curva por valor desta coluna (serie)")
+    parser.add_argument("--all-runs", action="store_true", help="inclui todas as execuções do log")
+    parser.add_argument("--watch", type=float, default=0, help="re-renderiza a cada N segundos")
+    args = parser.parse_args()
+
+    out = args.out or {"saturacao": "grafico_saturacao.png",
+                       "escalabilidade": "benchmark_escalabilidade.png",
+                       "rag": "benchmark_mestrado_final.png"}.get(args.kind, "serie.png")
+    while True:
+        start = time.perf_counter()
+        rows = build(args.kind, args.log, out, args.all_runs, x=args.x, y=args.y, by=args.by)
+        print(f"{out}: {rows:,} linhas em {time.perf_counter() - start:.2f}s")
+        if not args.watch:
+            break
+        time.sleep(args.watch)
@@ -0,0 +1,120 @@
+# ============================================================
+# RESULTS LOG — LOG COLUNAR INCREMENTAL DOS BENCHMARKS
+# Um arquivo binário por coluna, append a cada célula concluída
+# meta.json: esquema e vocabulário das colunas de texto
+# rows.bin:  int64, linhas confirmadas (gravado por último)
+# ============================================================
+
+import json
+import os
+
+import numpy as np
+
+STR = "str"
+
+
+class ResultsLog:
+    """
+    Log somente-append: cada `append` grava primeiro as colunas e só depois
+    confirma o novo total de linhas em rows.bin, então um benchmark que
+    cai no meio do caminho nunca deixa linhas parciais, e quem lê (o
+    report_builder, por exemplo) pode abrir o log a qualquer momento,
+    mesmo com o benchmark rodando. Colunas de texto são gravadas como
+    códigos int32 com o vocabulário em meta.json.
+    """
+
+    def __init__(self, path: str, columns: dict = None):
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if columns is not None and dict(columns) != meta["columns"]:
+                raise ValueError(f"{path} has columns {meta['columns']}, not {dict(columns)}")
+            self.columns, self.vocab = meta["columns"], meta["vocab"]
+        else:
+            if columns is None:
+                raise FileNotFoundError(f"{path} does not exist and no columns were given")
+            os.makedirs(path, exist_ok=True)
+            self.columns = {name: str(np.dtype(dtype)) if dtype != STR else STR for name, dtype in columns.items()}
+            self.vocab = {name: [] for name, dtype in self.columns.items() if dtype == STR}
+            for name in self.columns:
+                open(self._column_path(name), "wb").close()
+            np.zeros(1, dtype=np.int64).tofile(self._rows_path)
+            self._write_meta()
+
+        self._codes = {name: {v: i for i, v in enumerate(values)} for name, values in self.vocab.items()}
+
+    @property
+    def _rows_path(self):
+        return os.path.join(self.path, "rows.bin")
+
+    def _column_path(self, name: str):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _dtype(self, name: str):
+        return np.dtype(np.int32) if self.columns[name] == STR else np.dtype(self.columns[name])
+
+    def _write_meta(self):
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"columns": self.columns, "vocab": self.vocab}, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def __len__(self):
+        with open(self._rows_path, "rb") as f:
+            f.seek(-8, os.SEEK_END)
+            return int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+
+    def append(self, **values):
+        """
+        Acrescenta linhas. Cada coluna recebe um escalar ou um array; os
+        escalares são repetidos para o comprimento dos arrays.
+        """
+        if set(values) != set(self.columns):
+            raise ValueError(f"Expected columns {sorted(self.columns)}, got {sorted(values)}")
+        arrays = {name: np.atleast_1d(np.asarray(v)) for name, v in values.items()}
+        n = max(len(a) for a in arrays.values())
+
+        encoded, new_labels = {}, False
+        for name, a in arrays.items():
+            if self.columns[name] == STR:
+                codes = self._codes[name]
+                for label in map(str, np.unique(a)):
+                    if label not in codes:
+                        codes[label] = len(self.vocab[name])
+                        self.vocab[name].append(label)
+                        new_labels = True
+                a = np.array([codes[str(v)] for v in a], dtype=np.int32)
+            encoded[name] = np.broadcast_to(a.astype(self._dtype(name), copy=False), (n,))
+        if new_labels:
+            self._write_meta()
+
+        # Linhas de um append anterior interrompido (não confirmadas) são
+        # sobrescritas: cada coluna é gravada a partir do total confirmado.
+        base = len(self)
+        for name, a in encoded.items():
+            with open(self._column_path(name), "r+b") as f:
+                f.seek(base * self._dtype(name).itemsize)
+                np.ascontiguousarray(a).tofile(f)
+        with open(self._rows_path, "ab") as f:
+            np.int64(base + n).tofile(f)
+
+    def read(self, columns=None, decode: bool = True) -> dict:
+        """
+        Colunas confirmadas, mapeadas do disco (sem cópia para as numéricas).
+        Com decode=True as colunas de texto voltam como arrays de str; com
+        decode=False, como códigos int32 (ver `vocab`).
+        """
+        n = len(self)
+        out = {}
+        for name in columns or self.columns:
+            if n == 0:
+                data = np.empty(0, dtype=self._dtype(name))
+            else:
+                data = np.asarray(np.memmap(self._column_path(name), dtype=self._dtype(name), mode="r", shape=(n,)))
+            if decode and self.columns[name] == STR:
+                data = np.array(self.vocab[name], dtype=str)[data] if n else np.empty(0, dtype=str)
+            out[name] = data
+        return out
@@ -0,0 +1,145 @@
+# ============================================================
+# RESULTS STORE — AGREGAÇÃO VETORIZADA DE MÉTRICAS
+# Arrays pré-alocados indexados por (modelo, modo, step, repetição)
+# Bootstrap via Numba, salvamento colunar (.npz)
+# ============================================================
+
+import re
+import warnings
+from functools import lru_cache
+
+import numpy as np
+from numba import njit, prange
+
+METRICS = ("tokens", "latency", "acc", "cost", "cached_tokens", "ttft")
+
+
+# ----------------------------
+# MATCHING (padrões pré-compilados)
+# ----------------------------
+@lru_cache(maxsize=None)
+def _answer_pattern(target: str):
+    return re.compile(rf"\b{re.escape(target)}\b")
+
+
+def exact_match(answer: str, target: str) -> int:
+    return int(_answer_pattern(target).fullmatch(answer.strip()) is not None)
+
+
+# ----------------------------
+# BOOTSTRAP — Numba
+# ----------------------------
+@njit(parallel=True, cache=True)
+def _bootstrap_ci(samples, n_boot, alpha, seed):
+    """
+    samples: (células, repetições) com NaN nas posições não preenchidas.
+    Retorna (células, 2) com o intervalo [lo, hi] da média.
+    """
+    n_cells, n_rep = samples.shape
+    out = np.full((n_cells, 2), np.nan)
+
+    for c in prange(n_cells):
+        valid = np.empty(n_rep)
+        n = 0
+        for r in range(n_rep):
+            v = samples[c, r]
+            if not np.isnan(v):
+                valid[n] = v
+                n += 1
+        if n == 0:
+            continue
+
+        np.random.seed(seed + c)
+        means = np.empty(n_boot)
+        for b in range(n_boot):
+            acc = 0.0
+            for _ in range(n):
+                acc += valid[np.random.randint(0, n)]
+            means[b] = acc / n
+
+        means.sort()
+        out[c, 0] = means[int((alpha / 2) * (n_boot - 1))]
+        out[c, 1] = means[int((1 - alpha / 2) * (n_boot - 1))]
+
+    return out
+
+
+# ----------------------------
+# STORE
+# ----------------------------
+def _nan_reduce(fn, values, *args):
+    # Células ainda não preenchidas viram NaN sem emitir warnings.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return fn(values, *args, axis=-1)
+
+
+class ResultsStore:
+    def __init__(self, models, modes, steps, repeats: int):
+        self.models = list(models)
+        self.modes = list(modes)
+        self.steps = list(steps)
+        self.repeats = repeats
+        self._model_idx = {m: i for i, m in enumerate(self.models)}
+        self._mode_idx = {m: i for i, m in enumerate(self.modes)}
+        self._step_idx = {s: i for i, s in enumerate(self.steps)}
+        self.data = np.full(
+            (len(METRICS), len(self.models), len(self.modes), len(self.steps), repeats),
+            np.nan,
+        )
+
+    def record(self, model, mode, step, repeat: int, **metrics):
+        cell = (self._model_idx[model], self._mode_idx[mode], self._step_idx[step], repeat)
+        for name, value in metrics.items():
+            self.data[(METRICS.index(name),) + cell] = value
+
+    def metric(self, name: str) -> np.ndarray:
+        return self.data[METRICS.index(name)]
+
+    # --- agregações: retornam (modelos, modos, steps) ---
+    def mean(self, name: str) -> np.ndarray:
+        return _nan_reduce(np.nanmean, self.metric(name))
+
+    def std(self, name: str) -> np.ndarray:
+        return _nan_reduce(np.nanstd, self.metric(name))
+
+    def percentile(self, name: str, q) -> np.ndarray:
+        return _nan_reduce(np.nanpercentile, self.metric(name), q)
+
+    def bootstrap_ci(self, name: str, n_boot: int = 1000, alpha: float = 0.05, seed: int = 0) -> np.ndarray:
+        """
+        Intervalo de confiança da média por célula: (modelos, modos, steps, 2).
+        """
+        values = self.metric(name)
+        flat = np.ascontiguousarray(values.reshape(-1, self.repeats))
+        return _bootstrap_ci(flat, n_boot, alpha, seed).reshape(values.shape[:-1] + (2,))
+
+    # --- persistência colunar ---
+    def save(self, path: str):
+        # Uma linha por (modelo, modo, step, repetição) preenchida.
+        grid = np.indices(self.data.shape[1:]).reshape(4, -1)
+        values = self.data.reshape(len(METRICS), -1)
+        filled = ~np.all(np.isnan(values), axis=0)
+
+        np.savez(
+            path,
+            model=grid[0, filled].astype(np.int32),
+            mode=grid[1, filled].astype(np.int32),
+            step=np.asarray(self.steps)[grid[2, filled]],
+            repeat=grid[3, filled].astype(np.int32),
+            **{name: values[i, filled] for i, name in enumerate(METRICS)},
+            models=np.array(self.models),
+            modes=np.array(self.modes),
+            steps=np.asarray(self.steps),
+            repeats=np.int32(self.repeats),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ResultsStore":
+        with np.load(path) as f:
+            store = cls(f["models"].tolist(), f["modes"].tolist(), f["steps"].tolist(), int(f["repeats"]))
+            step_idx = np.array([store._step_idx[s] for s in f["step"].tolist()], dtype=np.int64)
+            for i, name in enumerate(METRICS):
+                if name in f:
+                    store.data[i, f["model"], f["mode"], step_idx, f["repeat"]] = f[name]
+        return store
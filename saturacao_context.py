@@ -1,122 +1,114 @@
 import os
-import time
-import re
 import numpy as np
-import matplotlib.pyplot as plt
 from google import genai
+from llm_cache import client_from_env
+from llm_sweep import TARGET, encode_context
+from report_builder import SATURATION_COLUMNS, log_store_cell, run_id, saturation_figure
+from results_log import ResultsLog
+from prompt_cache import PrefixCache, StubClient, generate, prompt_cost, save_cache_stats
+from results_store import ResultsStore, exact_match
 
 # ---------------- CONFIGURAÇÕES ----------------
 MODEL_NAME = "gemini-2.5-flash-lite"
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# VEXI_CACHE_MODE=record|replay|auto|off (ver llm_cache.py)
+# VEXI_LLM_STUB=1 usa o StubClient local no lugar da API
+make_live_client = (
+    StubClient if os.getenv("VEXI_LLM_STUB")
+    else lambda: genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+)
+client = client_from_env(make_live_client)
+prefix_cache = PrefixCache(client, MODEL_NAME)
 
 STEPS = [10, 50, 100, 250, 500, 1000, 2000]
+MODES = ["python", "vvm", "python_cached", "vvm_cached"]
 REPEATS = 5
-TARGET = "999"
+RESULTS_FILE = "resultados_saturacao.npz"
+# Log colunar, atualizado a cada célula concluída (ver report_builder.py)
+RESULTS_LOG = "resultados_saturacao.log"
 
-# ---------------- GERADOR DE CONTEXTO ----------------
-def stress_test_factory(n_ops, mode="python"):
-    question = "What is the value of the initial key? Answer only with the number."
-
-    if mode == "python":
-        ctx = f"initial_key = {TARGET}\n"
-        for i in range(n_ops):
-            ctx += f"item_{i} = {i} * 2\nupdate_inventory(item_{i})\n"
-        return f"{ctx}\nQuestion: {question}"
+# Preço por 1M tokens de entrada (gemini-2.5-flash-lite)
+PRICE_INPUT = 0.10
+PRICE_CACHED = 0.025
 
-    ctx = f"100 {TARGET} "
-    for i in range(n_ops):
-        ctx += f"40 {i} {i*2} "
-    rules = "Rules: 100:SetKey, 40:UpdateInventory\n"
-    return f"{rules}{ctx}\n\nQuestion: {question}"
+# ---------------- GERADOR DE CONTEXTO ----------------
+# O prompt é montado como prefixo estável (regras + contexto) seguido da
+# pergunta, para que o prefixo possa ir para o cache.
+def stress_test_parts(n_ops, mode="python"):
+    return encode_context(n_ops, mode)
 
-# ---------------- MÉTRICA DE ACURÁCIA ----------------
-def exact_match(answer):
-    return int(bool(re.fullmatch(rf"\b{TARGET}\b", answer.strip())))
+def stress_test_factory(n_ops, mode="python"):
+    prefix, question = stress_test_parts(n_ops, mode)
+    return prefix + question
 
 # ---------------- ESTRUTURA DE DADOS ----------------
-results = {
-    "python": {"tokens": [], "latency": [], "acc": []},
-    "vvm": {"tokens": [], "latency": [], "acc": []},
-}
+results = ResultsStore([MODEL_NAME], MODES, STEPS, REPEATS)
+results_log = ResultsLog(RESULTS_LOG, SATURATION_COLUMNS)
+RUN_ID = run_id()
 
 # ---------------- BENCHMARK ----------------
 print(f"\n▶ Iniciando benchmark")
 print(f"Modelo: {MODEL_NAME} | Repetições: {REPEATS}\n")
 
 for n in STEPS:
-    for mode in ["python", "vvm"]:
-        latencies, tokens_list, accs = [], [], []
-
-        for _ in range(REPEATS):
-            prompt = stress_test_factory(n, mode)
+    for mode in MODES:
+        base_mode, cached = mode.removesuffix("_cached"), mode.endswith("_cached")
+        prefix, question = stress_test_parts(n, base_mode)
 
+        for r in range(REPEATS):
             token_count = client.models.count_tokens(
                 model=MODEL_NAME,
-                contents=prompt
+                contents=prefix + question
             ).total_tokens
 
-            start = time.time()
-            response = client.models.generate_content(
-                model=MODEL_NAME,
-                contents=prompt
+            response = generate(
+                client, MODEL_NAME, prefix, question,
+                cache=prefix_cache if cached else None
+            )
+            usage = response.usage_metadata
+
+            results.record(
+                MODEL_NAME, mode, n, r,
+                tokens=token_count,
+                latency=response.latency,
+                acc=exact_match(response.text, TARGET),
+                cost=prompt_cost(usage, PRICE_INPUT, PRICE_CACHED),
+                cached_tokens=getattr(usage, "cached_content_token_count", None) or 0,
             )
-            latency = time.time() - start
-
-            acc = exact_match(response.text)
-
-            latencies.append(latency)
-            tokens_list.append(token_count)
-            accs.append(acc)
-
-        results[mode]["latency"].append((np.mean(latencies), np.std(latencies)))
-        results[mode]["tokens"].append((np.mean(tokens_list), np.std(tokens_list)))
-        results[mode]["acc"].append((np.mean(accs), np.std(accs)))
 
+        cell = (0, MODES.index(mode), STEPS.index(n))
+        log_store_cell(results_log, RUN_ID, results, MODEL_NAME, mode, n)
+        tok, lat, acc = (results.metric(k)[cell] for k in ("tokens", "latency", "acc"))
         print(
             f"Mode: {mode.upper()} | Ops: {n} | "
-            f"Tokens: {np.mean(tokens_list):.1f}±{np.std(tokens_list):.1f} | "
-            f"Lat: {np.mean(latencies):.2f}±{np.std(latencies):.2f}s | "
-            f"Acc: {np.mean(accs):.2f}"
+            f"Tokens: {tok.mean():.1f}±{tok.std():.1f} | "
+            f"Lat: {lat.mean():.2f}±{lat.std():.2f}s | "
+            f"Acc: {acc.mean():.2f}"
         )
 
+prefix_cache.close()
+results.save(RESULTS_FILE)
+
+# ---------------- CACHE: MEDIDO vs HARDCODED ----------------
+cached_idx = [MODES.index(m) for m in MODES if m.endswith("_cached")]
+plain_idx = [MODES.index(m) for m in MODES if not m.endswith("_cached")]
+cached_tokens = np.nansum(results.metric("cached_tokens")[0, cached_idx])
+prompt_tokens = np.nansum(results.metric("tokens")[0, cached_idx])
+
+stats = save_cache_stats(
+    float(cached_tokens), float(prompt_tokens),
+    latency_cached=float(np.nanmean(results.metric("latency")[0, cached_idx])),
+    latency_uncached=float(np.nanmean(results.metric("latency")[0, plain_idx])),
+    cost_cached=float(np.nansum(results.metric("cost")[0, cached_idx])),
+    cost_uncached=float(np.nansum(results.metric("cost")[0, plain_idx])),
+)
+print(
+    f"\nCache ratio medido: {stats['cache_ratio']:.2%} | "
+    f"Lat: {stats['latency_cached']:.2f}s (cache) vs {stats['latency_uncached']:.2f}s | "
+    f"Custo: ${stats['cost_cached']:.4f} (cache) vs ${stats['cost_uncached']:.4f}"
+)
+
 # ---------------- PLOTS ----------------
-ops = np.array(STEPS)
-
-fig, axes = plt.subplots(1, 3, figsize=(22, 6))
-
-# Tokens
-for mode, color in [("python", "blue"), ("vvm", "red")]:
-    mean = [v[0] for v in results[mode]["tokens"]]
-    std = [v[1] for v in results[mode]["tokens"]]
-    axes[0].errorbar(ops, mean, yerr=std, label=mode.upper(), marker='o', capsize=5)
-
-axes[0].set_title("Consumo Médio de Tokens")
-axes[0].set_xlabel("Número de Operações")
-axes[0].set_ylabel("Tokens")
-axes[0].legend()
-
-# Latência
-for mode, color in [("python", "blue"), ("vvm", "red")]:
-    mean = [v[0] for v in results[mode]["latency"]]
-    std = [v[1] for v in results[mode]["latency"]]
-    axes[1].errorbar(ops, mean, yerr=std, label=mode.upper(), marker='s', capsize=5)
-
-axes[1].set_title("Latência Média de Inferência")
-axes[1].set_xlabel("Número de Operações")
-axes[1].set_ylabel("Segundos")
-axes[1].legend()
-
-# Acurácia
-for mode, color in [("python", "blue"), ("vvm", "red")]:
-    mean = [v[0] for v in results[mode]["acc"]]
-    axes[2].plot(ops, mean, label=mode.upper(), marker='d')
-
-axes[2].set_title("Fidelidade da Resposta")
-axes[2].set_ylim(-0.05, 1.05)
-axes[2].set_xlabel("Número de Operações")
-axes[2].set_ylabel("Acurácia Média")
-axes[2].legend()
-
-plt.tight_layout()
-plt.savefig("baseline_mestrado.png", dpi=300)
-plt.show()
+# A mesma figura pode ser gerada a qualquer momento (inclusive durante a
+# execução) com: python report_builder.py saturacao resultados_saturacao.log
+saturation_figure(results, "baseline_mestrado.png", dpi=300)
+print("Figura salva em baseline_mestrado.png")
@@ -1,20 +1,28 @@
 import os
-import time
-import re
+from functools import partial
 import numpy as np
-import matplotlib.pyplot as plt
 from google import genai
+from llm_cache import client_from_env
+from report_builder import RAG_COLUMNS, RAG_STAGES, latest_run, rag_figure, run_id
+from results_log import ResultsLog
+from results_store import exact_match
 from sentence_transformers import SentenceTransformer
-import faiss
+from rag_pipeline import RagPipeline, chunk_lines, chunk_python, chunk_vvm
 
 # ---------------- CONFIG ----------------
 MODEL_NAME = "gemini-2.5-flash-lite"
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# VEXI_CACHE_MODE=record|replay|auto|off (ver llm_cache.py)
+client = client_from_env(lambda: genai.Client(api_key=os.getenv("GEMINI_API_KEY")))
 embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+rag = RagPipeline(embedding_model, workers=4)
 
 STEPS = [10, 100]
 REPEATS = 5
 
+# Aridade dos opcodes usados no contexto VVM (100:SetKey, 40:UpdateInv)
+CONTEXT_ARITY = {100: 1, 40: 2}
+VVM_WINDOW = 16
+
 # ---------------- DATA GEN ----------------
 def stress_test_factory(n_ops, mode="python"):
     expected = "999"
@@ -33,32 +41,28 @@ def stress_test_factory(n_ops, mode="python"):
     return ctx, question, expected
 
 # ---------------- RAG ----------------
-def run_rag(context, query):
-    start = time.time()
-    chunks = context.split("\n")
-    emb = embedding_model.encode(chunks)
-
-    index = faiss.IndexFlatL2(emb.shape[1])
-    index.add(np.array(emb).astype("float32"))
-
-    q_emb = embedding_model.encode([query])
-    _, I = index.search(np.array(q_emb).astype("float32"), k=2)
-
-    retrieved = "\n".join(chunks[i] for i in I[0])
-    return retrieved, time.time() - start
+# Ajusta o tamanho de lote uma vez, antes do benchmark, para que o overhead
+# medido reflita a recuperação já aquecida e em lotes.
+_ctx_tune, _, _ = stress_test_factory(max(STEPS), "python")
+print(f"RAG batch size: {rag.tune_batch_size(chunk_lines(_ctx_tune))}")
+
+CHUNKERS = {
+    "rag": chunk_python,
+    "rag_vvm": partial(chunk_vvm, arity=CONTEXT_ARITY, window=VVM_WINDOW),
+}
 
-# ---------------- METRIC ----------------
-def exact_match(answer, target):
-    return int(bool(re.fullmatch(rf"\b{target}\b", answer.strip())))
+def run_rag(context, query, mode="rag"):
+    return rag.run(context, query, k=2, chunker=CHUNKERS[mode])
 
 # ---------------- BENCHMARK ----------------
-results = {
-    m: {"lat": [], "tok": [], "acc": []}
-    for m in ["python", "vvm", "rag"]
-}
+# Cada requisição vai para o log assim que termina; a figura pode ser gerada
+# durante a execução com: python report_builder.py rag benchmark_mestrado_rag.log
+results_log = ResultsLog("benchmark_mestrado_rag.log", RAG_COLUMNS)
+RUN_ID = run_id()
+NO_STAGES = {stage: np.nan for stage in RAG_STAGES}
 
 for n in STEPS:
-    for _ in range(REPEATS):
+    for r in range(REPEATS):
 
         ctx_py, q, tgt = stress_test_factory(n, "python")
         ctx_vvm, _, _ = stress_test_factory(n, "vvm")
@@ -66,14 +70,18 @@ for n in STEPS:
         configs = {
             "python": ctx_py,
             "vvm": ctx_vvm,
-            "rag": ctx_py
+            "rag": ctx_py,
+            "rag_vvm": ctx_vvm
         }
 
         for mode, ctx in configs.items():
             overhead = 0
+            stages = NO_STAGES
 
-            if mode == "rag":
-                ctx, overhead = run_rag(ctx, q)
+            if mode in CHUNKERS:
+                ctx, timings = run_rag(ctx, q, mode)
+                overhead = timings.total
+                stages = {stage: getattr(timings, stage) for stage in RAG_STAGES}
                 prompt = f"Context:\n{ctx}\n\nQuestion: {q}"
             else:
                 prompt = f"{ctx}\n\nQuestion: {q}"
@@ -83,39 +91,17 @@ for n in STEPS:
                 contents=prompt
             ).total_tokens
 
-            t0 = time.time()
             resp = client.models.generate_content(
                 model=MODEL_NAME,
                 contents=prompt
             )
-            latency = (time.time() - t0) + overhead
+            latency = resp.latency + overhead
 
             acc = exact_match(resp.text, tgt)
 
-            results[mode]["lat"].append(latency)
-            results[mode]["tok"].append(tokens)
-            results[mode]["acc"].append(acc)
+            results_log.append(run=RUN_ID, mode=mode, step=n, repeat=r,
+                               latency=latency, tokens=tokens, acc=acc, **stages)
 
 # ---------------- PLOT ----------------
-def mean_std(arr):
-    return np.mean(arr), np.std(arr)
-
-labels = ["Python", "VVM", "RAG"]
-
-fig, ax = plt.subplots(1, 3, figsize=(20, 6))
-
-for i, metric in enumerate(["lat", "tok", "acc"]):
-    means = []
-    stds = []
-
-    for m in ["python", "vvm", "rag"]:
-        m_mean, m_std = mean_std(results[m][metric])
-        means.append(m_mean)
-        stds.append(m_std)
-
-    ax[i].bar(labels, means, yerr=stds, capsize=5)
-    ax[i].set_title(metric.upper())
-
-plt.tight_layout()
-plt.savefig("benchmark_mestrado_final.png")
-plt.show()
+rag_figure(latest_run(results_log.read()), "benchmark_mestrado_final.png")
+print("Figura salva em benchmark_mestrado_final.png")
@@ -0,0 +1,223 @@
+# ============================================================
+# SNAPSHOT — CHECKPOINT DO MUNDO DA VVM
+# Buffers NumPy crus + cabeçalho JSON pequeno
+# Restore via np.memmap (sem cópia), deltas só das entidades alteradas
+# ============================================================
+
+import json
+import time
+from dataclasses import asdict
+
+import numpy as np
+
+from vvm import World, WorldConfig
+
+MAGIC = b"VXSN"
+VERSION = 1
+ALIGN = 64
+
+# Colunas por entidade (entram nos deltas) e tabela de programas
+ENTITY_COLUMNS = ("states", "alive", "prog_of", "ip")
+PROGRAM_COLUMNS = ("flat", "offsets")
+
+
+# ----------------------------
+# FORMATO
+# MAGIC | u32 versão | u64 tamanho do cabeçalho | cabeçalho JSON
+# seguido dos buffers, cada um alinhado em ALIGN bytes
+# ----------------------------
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % ALIGN))
+
+
+def write_arrays(path: str, arrays: dict, meta: dict):
+    """
+    Grava `arrays` sem conversão: cada buffer vai para o disco direto da
+    memória (tofile), na ordem e dtype originais.
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+
+    # Os offsets dependem do tamanho do cabeçalho, que contém os offsets:
+    # recalcula até o tamanho (arredondado para ALIGN) estabilizar.
+    layout, header, previous = {}, b"", -1
+    while len(header) != previous:
+        previous = len(header)
+        base = len(MAGIC) + 4 + 8 + len(header)
+        base += -base % ALIGN
+        offset = base
+        for name, a in arrays.items():
+            layout[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+            offset += a.nbytes + (-a.nbytes % ALIGN)
+        header = json.dumps({"arrays": layout, "meta": meta}).encode("utf-8")
+        header += b" " * (-len(header) % ALIGN)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint32(VERSION).tobytes())
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        _pad(f)
+        for name, a in arrays.items():
+            assert f.tell() == layout[name]["offset"]
+            a.tofile(f)
+            _pad(f)
+
+
+def read_arrays(path: str, mode: str = "r"):
+    """
+    Mapeia os buffers de um snapshot. mode="r" é somente-leitura; "c" é
+    copy-on-write (pode alterar sem tocar o arquivo). Retorna (arrays, meta).
+    """
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a VVM snapshot")
+        version = int(np.frombuffer(f.read(4), dtype=np.uint32)[0])
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(size))
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=np.dtype(spec["dtype"]))
+        else:
+            arrays[name] = np.asarray(np.memmap(path, dtype=np.dtype(spec["dtype"]), mode=mode,
+                                                offset=spec["offset"], shape=shape))
+    return arrays, header["meta"]
+
+
+# ----------------------------
+# MUNDO COMPLETO
+# ----------------------------
+def save_snapshot(path: str, world: World):
+    arrays = {name: getattr(world, name) for name in ENTITY_COLUMNS + PROGRAM_COLUMNS}
+    write_arrays(path, arrays, {"kind": "full", "tick": world.tick, "cursor": world.cursor,
+                                 "config": asdict(world.config)})
+
+
+def load_snapshot(path: str, mode: str = "c") -> World:
+    """
+    Restore por memmap: nada é lido até ser acessado. O padrão "c"
+    (copy-on-write) deixa o mundo restaurado pronto para continuar a
+    simulação sem alterar o arquivo.
+    """
+    arrays, meta = read_arrays(path, mode)
+    if meta["kind"] != "full":
+        raise ValueError(f"{path} is a delta snapshot; use restore_chain")
+    return World(config=WorldConfig(**meta["config"]), tick=meta["tick"],
+                 cursor=meta.get("cursor", 0), **arrays)
+
+
+# ----------------------------
+# DELTAS
+# ----------------------------
+class DeltaTracker:
+    """
+    Guarda uma cópia das colunas por entidade do último checkpoint e grava,
+    a cada delta, só as linhas que mudaram desde então (mais a cauda nova
+    da tabela de programas, que só cresce).
+    """
+
+    def __init__(self, world: World):
+        self.world = world
+        self._mark()
+
+    def _mark(self):
+        self.base = {name: np.array(getattr(self.world, name)) for name in ENTITY_COLUMNS}
+        self.base_tokens = len(self.world.flat)
+        self.base_programs = len(self.world.offsets) - 1
+
+    def changed(self) -> np.ndarray:
+        mask = np.zeros(len(self.world), dtype=np.bool_)
+        for name in ENTITY_COLUMNS:
+            diff = getattr(self.world, name) != self.base[name]
+            mask |= diff.any(axis=1) if diff.ndim > 1 else diff
+        return np.flatnonzero(mask)
+
+    def save_delta(self, path: str) -> int:
+        if len(self.world) != len(self.base["alive"]):
+            raise ValueError("Entity count changed since the last checkpoint; take a full snapshot")
+        idx = self.changed()
+        arrays = {"index": idx}
+        for name in ENTITY_COLUMNS:
+            arrays[name] = getattr(self.world, name)[idx]
+        arrays["flat_tail"] = self.world.flat[self.base_tokens:]
+        arrays["offsets_tail"] = self.world.offsets[self.base_programs + 1:]
+        write_arrays(path, arrays, {"kind": "delta", "tick": self.world.tick, "cursor": self.world.cursor})
+        self._mark()
+        return len(idx)
+
+
+def restore_chain(base_path: str, delta_paths=()) -> World:
+    """
+    Restaura um snapshot completo e aplica os deltas em ordem. As colunas por
+    entidade ficam em memmap copy-on-write: só as páginas alteradas pelos
+    deltas são copiadas para a memória.
+    """
+    world = load_snapshot(base_path, mode="c")
+    for path in delta_paths:
+        delta, meta = read_arrays(path)
+        if meta["kind"] != "delta":
+            raise ValueError(f"{path} is not a delta snapshot")
+        idx = delta["index"]
+        for name in ENTITY_COLUMNS:
+            getattr(world, name)[idx] = delta[name]
+        if len(delta["flat_tail"]) or len(delta["offsets_tail"]):
+            world.flat = np.concatenate((world.flat, delta["flat_tail"]))
+            world.offsets = np.concatenate((world.offsets, delta["offsets_tail"]))
+        world.tick = meta["tick"]
+        world.cursor = meta.get("cursor", 0)
+    return world
+
+
+# ----------------------------
+# BENCHMARK — 1M entidades
+# ----------------------------
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    N = 1_000_000
+    CHANGED = 0.01
+
+    rng = np.random.default_rng(0)
+    flat = np.array([21, 90, 20, 1, 0, 30, 50, 50], dtype=np.int32)
+    world = World.create(N, flat, [0, len(flat)],
+                         config=WorldConfig(rotation="wrap", bounds="torus", width=4096, height=4096))
+    world.states[:, 0] = rng.integers(0, 4096, N)
+    world.states[:, 1] = rng.integers(0, 4096, N)
+
+    tmp = tempfile.mkdtemp()
+    full_path = os.path.join(tmp, "world.vxsn")
+    delta_path = os.path.join(tmp, "world.delta.vxsn")
+
+    start = time.perf_counter()
+    save_snapshot(full_path, world)
+    t_save = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restored = load_snapshot(full_path)
+    t_load = time.perf_counter() - start
+    assert np.array_equal(restored.states, world.states)
+
+    tracker = DeltaTracker(world)
+    hit = rng.choice(N, int(N * CHANGED), replace=False)
+    world.states[hit, 2] = (world.states[hit, 2] + 90) % 360
+
+    start = time.perf_counter()
+    n_changed = tracker.save_delta(delta_path)
+    t_delta = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chained = restore_chain(full_path, [delta_path])
+    t_chain = time.perf_counter() - start
+    assert np.array_equal(chained.states, world.states)
+
+    mb = lambda p: os.path.getsize(p) / 1e6
+    print(f"Entidades: {N:,} | Estado: {world.states.dtype}")
+    print(f"Snapshot completo: {t_save * 1000:.1f} ms | {mb(full_path):.1f} MB")
+    print(f"Restore (memmap):  {t_load * 1000:.2f} ms")
+    print(f"Delta ({n_changed:,} alteradas): {t_delta * 1000:.1f} ms | {mb(delta_path):.2f} MB")
+    print(f"Restore + delta:   {t_chain * 1000:.1f} ms")
@@ -0,0 +1,131 @@
+# ============================================================
+# SPATIAL INDEX — GRADE UNIFORME (Numba)
+# Construção por counting sort O(n + células), reconstruída a cada tick
+# Consultas de vizinho mais próximo e de raio por anéis de células
+# ============================================================
+
+import numpy as np
+from numba import njit
+
+# Layout do array `params` da grade
+G_ORIGIN_X, G_ORIGIN_Y, G_CELL, G_WIDTH, G_HEIGHT = range(5)
+
+# Limite de células por entidade: mundos esparsos (ou sem bordas) aumentam
+# a célula em vez de alocar uma grade enorme e vazia.
+MAX_CELLS_PER_ENTITY = 4
+MIN_CELLS = 1024
+
+
+@njit
+def _cell_of(x, y, params):
+    cx = (x - params[G_ORIGIN_X]) // params[G_CELL]
+    cy = (y - params[G_ORIGIN_Y]) // params[G_CELL]
+    cx = min(max(cx, 0), params[G_WIDTH] - 1)
+    cy = min(max(cy, 0), params[G_HEIGHT] - 1)
+    return cx, cy
+
+
+@njit
+def build_grid(xs, ys, alive, cell_size):
+    """
+    Indexa as entidades vivas. Retorna (start, items, params): as entidades
+    da célula c são items[start[c]:start[c+1]].
+    """
+    n = len(xs)
+    min_x, min_y = np.int64(0), np.int64(0)
+    max_x, max_y = np.int64(0), np.int64(0)
+    first = True
+    for i in range(n):
+        if alive[i]:
+            x, y = np.int64(xs[i]), np.int64(ys[i])
+            if first:
+                min_x, max_x, min_y, max_y = x, x, y, y
+                first = False
+            else:
+                min_x, max_x = min(min_x, x), max(max_x, x)
+                min_y, max_y = min(min_y, y), max(max_y, y)
+
+    cell = np.int64(max(cell_size, 1))
+    max_cells = max(MAX_CELLS_PER_ENTITY * n, MIN_CELLS)
+    while ((max_x - min_x) // cell + 1) * ((max_y - min_y) // cell + 1) > max_cells:
+        cell *= 2
+
+    params = np.empty(5, dtype=np.int64)
+    params[G_ORIGIN_X] = min_x
+    params[G_ORIGIN_Y] = min_y
+    params[G_CELL] = cell
+    params[G_WIDTH] = (max_x - min_x) // cell + 1
+    params[G_HEIGHT] = (max_y - min_y) // cell + 1
+    n_cells = params[G_WIDTH] * params[G_HEIGHT]
+
+    # Counting sort por célula
+    cell_ids = np.empty(n, dtype=np.int64)
+    start = np.zeros(n_cells + 1, dtype=np.int64)
+    for i in range(n):
+        if alive[i]:
+            cx, cy = _cell_of(np.int64(xs[i]), np.int64(ys[i]), params)
+            cell_ids[i] = cy * params[G_WIDTH] + cx
+            start[cell_ids[i] + 1] += 1
+        else:
+            cell_ids[i] = -1
+    for c in range(n_cells):
+        start[c + 1] += start[c]
+
+    fill = start[:-1].copy()
+    items = np.empty(start[n_cells], dtype=np.int64)
+    for i in range(n):
+        c = cell_ids[i]
+        if c >= 0:
+            items[fill[c]] = i
+            fill[c] += 1
+
+    return start, items, params
+
+
+@njit
+def nearest(start, items, params, xs, ys, colors, alive, x, y, color, exclude, max_dist2):
+    """
+    Entidade viva mais próxima de (x, y) com a cor pedida (0 = qualquer),
+    ignorando `exclude` e entidades a distância² maior que `max_dist2`
+    (-1 = sem limite). Empates ficam com o menor índice. Retorna -1 se não
+    houver.
+    """
+    cell = params[G_CELL]
+    gw, gh = params[G_WIDTH], params[G_HEIGHT]
+    cx, cy = _cell_of(x, y, params)
+
+    best, best_d2 = -1, np.int64(-1)
+    max_ring = max(cx, gw - 1 - cx, cy, gh - 1 - cy)
+    for r in range(max_ring + 1):
+        # Todo ponto de uma célula do anel r está a pelo menos
+        # (r - 1) * cell + 1 de (x, y): dá para parar cedo.
+        if r > 0:
+            ring_min = (r - 1) * cell + 1
+            if max_dist2 >= 0 and ring_min * ring_min > max_dist2:
+                break
+            if best >= 0 and ring_min * ring_min > best_d2:
+                break
+
+        for gy in range(max(cy - r, 0), min(cy + r, gh - 1) + 1):
+            # Linhas do topo/base do anel são percorridas inteiras; as do
+            # meio só têm as duas células das laterais.
+            step = 1 if (gy == cy - r or gy == cy + r) else 2 * r
+            for gx in range(cx - r, cx + r + 1, step):
+                if gx < 0 or gx >= gw:
+                    continue
+                c = gy * gw + gx
+                for k in range(start[c], start[c + 1]):
+                    j = items[k]
+                    if j == exclude or not alive[j]:
+                        continue
+                    if color != 0 and colors[j] != color:
+                        continue
+                    dx = np.int64(xs[j]) - x
+                    dy = np.int64(ys[j]) - y
+                    d2 = dx * dx + dy * dy
+                    if max_dist2 >= 0 and d2 > max_dist2:
+                        continue
+                    if best < 0 or d2 < best_d2 or (d2 == best_d2 and j < best):
+                        best, best_d2 = j, d2
+    return best
+
@@ -1,22 +1,17 @@
+import json
 import os
+import time
 from google import genai
 from google.genai import types
 from pydantic import BaseModel, Field
+import vexi_isa
+from nl_compiler import compile_behavior
 
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
 MODEL_ID = "gemini-2.5-flash"
 
-system_rules = """
-Role: Bytecode Compiler.
-10:Shape(1:Circ,2:Sq,3:Tri)
-11:Color(1:R,2:B,3:G)
-12:Speed(V)
-20:Move(X,Y)
-21:Rotate(D)
-30:Seek(X,Y)
-31:Consume
-"""
+system_rules = vexi_isa.system_rules()
 
 comportamento_input = "A entidade deve iniciar definindo sua forma como Quadrado e cor Azul. Defina velocidade 5. Mova-se para x=50, y=50. Gire 90 graus. Busque o alvo em 100, 100 e finalmente Consuma."
 
@@ -43,10 +38,25 @@ while True:
         break
         
     try:
-        response = chat.send_message(texto_usuario)
-        uso = response.usage_metadata
-        print(f"Bytecode: {response.text.strip()}")
-        print(f"--- [Tokens: Entrada: {uso.prompt_token_count} | Saída: {uso.candidates_token_count} | Total: {uso.total_token_count}] ---")
+        # Frases conhecidas são compiladas localmente; só o resto vai ao LLM
+        usos = []
+
+        def via_llm(frase):
+            response = chat.send_message(frase)
+            usos.append(response.usage_metadata)
+            return json.loads(response.text)["bytecode"]
+
+        inicio = time.perf_counter()
+        resultado = compile_behavior(texto_usuario, fallback=via_llm)
+        duracao = time.perf_counter() - inicio
+        print(f"Bytecode: {resultado.bytecode}" + ("" if resultado.valid else " (inválido)"))
+        if not usos:
+            print(f"--- [Regras locais: {resultado.hits} frases | 0 tokens | {duracao * 1e6:.0f} µs] ---")
+        else:
+            entrada = sum(u.prompt_token_count or 0 for u in usos)
+            saida = sum(u.candidates_token_count or 0 for u in usos)
+            print(f"--- [Regras locais: {resultado.hits} frases | LLM: {len(usos)} frases | "
+                  f"Tokens: Entrada: {entrada} | Saída: {saida} | Total: {entrada + saida}] ---")
     except Exception as e:
         print(f"Erro: {e}")
 
@@ -0,0 +1,232 @@
+# ============================================================
+# TICK SCHEDULER — LAÇO DE TEMPO REAL DA VVM
+# Timestep fixo, orçamento de tempo por tick
+# Programas que não cabem no orçamento continuam no tick seguinte (ip por entidade)
+# Se nem 1 instrução por entidade cabe, as entidades se revezam entre ticks
+# Relatório de jitter e frame time p99
+# ============================================================
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from vvm import World
+
+# Margem sobre o orçamento ao ajustar o número de instruções por tick
+SAFETY = 0.8
+# Crescimento máximo do orçamento de instruções de um tick para o outro
+MAX_GROWTH = 2.0
+# Abaixo disso o laço não dorme: gira até o prazo (time.sleep é impreciso)
+SPIN = 0.001
+
+
+@dataclass
+class TickReport:
+    hz: float
+    budget: float
+    entities: int
+    frame_times: np.ndarray   # tempo de execução de cada tick (s)
+    lateness: np.ndarray      # atraso do início de cada tick sobre o prazo (s)
+    steps: np.ndarray         # instruções por entidade permitidas em cada tick
+    window: np.ndarray        # entidades executadas em cada tick (rodízio)
+    pending: np.ndarray       # entidades com programa pela metade ao fim do tick
+    skipped: int              # ticks descartados para recuperar o atraso
+
+    @property
+    def p50(self) -> float:
+        return float(np.percentile(self.frame_times, 50))
+
+    @property
+    def p99(self) -> float:
+        return float(np.percentile(self.frame_times, 99))
+
+    @property
+    def jitter(self) -> float:
+        """
+        Desvio padrão do intervalo entre inícios de ticks consecutivos.
+        """
+        if len(self.lateness) < 2:
+            return 0.0
+        return float(np.std(np.diff(self.lateness)))
+
+    @property
+    def overruns(self) -> int:
+        return int(np.count_nonzero(self.frame_times > self.budget))
+
+    @property
+    def meets_budget(self) -> bool:
+        return self.p99 <= self.budget
+
+    def summary(self) -> str:
+        ms = 1000
+        return (f"{self.entities:>9,} entidades @ {self.hz:.0f} Hz | "
+                f"frame p50 {self.p50 * ms:6.2f} ms  p99 {self.p99 * ms:6.2f} ms "
+                f"(orçamento {self.budget * ms:.2f} ms) | "
+                f"jitter {self.jitter * ms:.3f} ms | "
+                f"estouros {self.overruns} | descartados {self.skipped} | "
+                f"instr/tick {int(np.median(self.steps))} | "
+                f"entidades/tick {int(np.median(self.window)):,} | "
+                f"pendentes {int(np.median(self.pending)):,}")
+
+
+class TickScheduler:
+    """
+    Roda `world.step` a `hz` ticks por segundo. O orçamento de cada tick é
+    `budget` segundos (padrão: 80% do timestep, o resto fica para o quadro).
+    O número de instruções que cada entidade pode executar por tick é
+    ajustado a partir do tempo medido do tick anterior; o que não couber
+    continua no próximo tick a partir de world.ip.
+
+    Com uma instrução por entidade o tick ainda custa O(entidades). Se nem
+    isso cabe no orçamento, o scheduler passa a reduzir a janela de
+    entidades executadas por tick (world.step(window=...)), em rodízio:
+    cada entidade avança a cada len(world) / janela ticks. Ao sobrar
+    orçamento, a janela volta a crescer antes das instruções. Em mundos com
+    SEEK_NEAREST/CONSUME_NEAR a reconstrução da grade continua O(n) por
+    tick; esse piso aparece no frame time com janela mínima.
+    """
+
+    def __init__(self, world: World, hz: float = 60.0, budget: float = None, max_steps: int = None):
+        self.world = world
+        self.hz = hz
+        self.timestep = 1.0 / hz
+        self.budget = 0.8 * self.timestep if budget is None else budget
+        # Nenhum programa precisa de mais instruções que tokens: acima disso
+        # o tick já roda os programas inteiros.
+        self.max_steps = max_steps or max(int(np.diff(world.offsets).max(initial=1)), 1)
+        self.steps = self.max_steps
+        self.window = len(world)
+
+    def warmup(self, calibrate_ticks: int = 30):
+        """
+        Compila o kernel fatiado e ajusta instruções e janela rodando
+        `calibrate_ticks` ticks numa cópia do mundo, para que os primeiros
+        ticks medidos não paguem a convergência. O mundo não é alterado.
+        """
+        w = self.world
+        probe = World(states=w.states[:1].copy(), alive=w.alive[:1].copy(), prog_of=w.prog_of[:1].copy(),
+                      ip=w.ip[:1].copy(), flat=w.flat, offsets=w.offsets, config=w.config)
+        probe.step(max_steps=1, window=1)
+        if calibrate_ticks:
+            copy = World(states=w.states.copy(), alive=w.alive.copy(), prog_of=w.prog_of,
+                         ip=w.ip.copy(), flat=w.flat, offsets=w.offsets, config=w.config,
+                         tick=w.tick, cursor=w.cursor)
+            for _ in range(calibrate_ticks):
+                start = time.perf_counter()
+                copy.step(max_steps=self.steps, window=self.window)
+                self._adapt(time.perf_counter() - start)
+
+    def _adapt(self, elapsed: float):
+        ratio = MAX_GROWTH if elapsed <= 0 else min(SAFETY * self.budget / elapsed, MAX_GROWTH)
+        n = len(self.world)
+        if ratio < 1:
+            # Acima do orçamento: corta instruções e, no mínimo delas, entidades
+            if self.steps > 1:
+                self.steps = max(int(self.steps * ratio), 1)
+            else:
+                self.window = max(int(self.window * ratio), 1)
+        elif self.window < n:
+            # +1: uma janela pequena também precisa conseguir crescer
+            self.window = min(max(int(self.window * ratio), self.window + 1), n)
+        else:
+            self.steps = min(max(int(self.steps * ratio), 1), self.max_steps)
+
+    def run(self, n_ticks: int, realtime: bool = True) -> TickReport:
+        """
+        Executa `n_ticks` ticks. Com realtime=False não espera entre ticks
+        (mede só o custo). Se o laço atrasar mais de um timestep, os prazos
+        perdidos são descartados em vez de acumulados.
+        """
+        frame_times = np.empty(n_ticks)
+        lateness = np.empty(n_ticks)
+        steps = np.empty(n_ticks, dtype=np.int64)
+        window = np.empty(n_ticks, dtype=np.int64)
+        pending = np.empty(n_ticks, dtype=np.int64)
+        skipped = 0
+
+        deadline = time.perf_counter()
+        for t in range(n_ticks):
+            if realtime:
+                while True:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    if remaining > SPIN:
+                        time.sleep(remaining - SPIN)
+
+            start = time.perf_counter()
+            lateness[t] = start - deadline
+            steps[t] = self.steps
+            window[t] = self.window
+            self.world.step(max_steps=self.steps, window=self.window)
+            elapsed = time.perf_counter() - start
+
+            frame_times[t] = elapsed
+            pending[t] = np.count_nonzero(self.world.ip)
+            self._adapt(elapsed)
+
+            deadline += self.timestep
+            now = time.perf_counter()
+            if now - deadline > self.timestep:
+                missed = int((now - deadline) // self.timestep)
+                skipped += missed
+                deadline += missed * self.timestep
+
+        return TickReport(self.hz, self.budget, len(self.world), frame_times, lateness, steps, window,
+                          pending, skipped)
+
+
+def max_entities(make_world, hz: float = 60.0, n_ticks: int = 120, start: int = 1024, limit: int = 1 << 24):
+    """
+    Maior número de entidades (dobrando a partir de `start`) cujo p99 cabe no
+    orçamento rodando os programas inteiros a cada tick. `make_world(n)`
+    cria o mundo. Retorna (n, relatórios de cada tentativa).
+    """
+    best, reports = 0, []
+    n = start
+    while n <= limit:
+        scheduler = TickScheduler(make_world(n), hz)
+        scheduler.warmup()
+        report = scheduler.run(n_ticks, realtime=False)
+        reports.append(report)
+        if (report.p99 > scheduler.budget or report.steps.min() < scheduler.max_steps
+                or report.window.min() < n):
+            break
+        best = n
+        n *= 2
+    return best, reports
+
+
+# ----------------------------
+# BENCHMARK
+# ----------------------------
+if __name__ == "__main__":
+    import argparse
+
+    from dataset_tools import load_corpus
+    from vvm import WorldConfig
+
+    parser = argparse.ArgumentParser(description="Laço de tempo real da VVM com orçamento por tick.")
+    parser.add_argument("--hz", type=float, default=60.0)
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--entities", type=int, nargs="*", default=[5_000, 20_000, 100_000])
+    args = parser.parse_args()
+
+    flat, offsets = load_corpus("dataset.jsonl")
+    config = WorldConfig(rotation="wrap", bounds="torus", width=4096, height=4096)
+    rng = np.random.default_rng(0)
+
+    def make_world(n):
+        world = World.create(n, flat, offsets, prog_of=rng.integers(0, len(offsets) - 1, n), config=config)
+        world.states[:, 0] = rng.integers(0, 4096, n)
+        world.states[:, 1] = rng.integers(0, 4096, n)
+        return world
+
+    for n in args.entities:
+        scheduler = TickScheduler(make_world(n), args.hz)
+        scheduler.warmup()
+        print(scheduler.run(args.ticks).summary())
+
+    n, _ = max_entities(make_world, args.hz)
+    print(f"Máximo com programas inteiros a {args.hz:.0f} Hz (p99 no orçamento): {n:,} entidades")
@@ -0,0 +1,80 @@
+# ============================================================
+# TRADITIONAL — SEMÂNTICA DE REFERÊNCIA EM PYTHON
+# As funções do TRADITIONAL_CODE, fonte única para os benchmarks e o vvm_fuzz.py
+# world_functions: as mesmas funções num mundo limitado (WorldConfig)
+# ============================================================
+
+import inspect
+import math
+
+
+def set_shape(e, v): e.shape = v
+def set_color(e, v): e.color = v
+def set_speed(e, v): e.speed = v
+def move(e, dx, dy): e.x += dx * e.speed; e.y += dy * e.speed
+def rotate(e, a): e.rotation += a
+def seek(e, tx, ty):
+    if e.x < tx: e.x += e.speed
+    if e.x > tx: e.x -= e.speed
+    if e.y < ty: e.y += e.speed
+    if e.y > ty: e.y -= e.speed
+def consume(e): pass
+
+
+# Texto das definições como aparece no TRADITIONAL_CODE (conta tokens)
+TRADITIONAL_FUNCTIONS = "".join(
+    inspect.getsource(fn) for fn in (set_shape, set_color, set_speed, move, rotate, seek, consume)
+)
+
+
+# Instruções fora do TRADITIONAL_CODE: spawn reinicia a entidade; as
+# consultas entre entidades não têm efeito sem um mundo (ver vvm_fuzz.py).
+def spawn(e, t): e.x = 0; e.y = 0; e.rotation = 0; e.color = 0; e.speed = 1; e.shape = t
+def seek_nearest(e, c): pass
+def consume_near(e, r): pass
+
+
+# Nome da instrução na ISA (minúsculo) -> função
+FUNCTIONS = {
+    fn.__name__: fn
+    for fn in (spawn, set_shape, set_color, set_speed, move, rotate, seek, consume, seek_nearest, consume_near)
+}
+
+
+def world_functions(config) -> dict:
+    """
+    FUNCTIONS num mundo `config` (vvm.WorldConfig), escrito direto da
+    documentação e não do kernel: inteiros do Python (sem estouro), posição
+    presa ou dobrada depois de cada passo, ROTATE convertido para
+    angle_units com arredondamento e, com heading, MOVE girado pela rotação
+    atual (seno/cosseno em ponto fixo Q10 do grau mais próximo).
+    """
+    units = config.angle_units
+
+    def bound(e):
+        if config.bounds == "clamp":
+            e.x = min(max(e.x, 0), config.width - 1)
+            e.y = min(max(e.y, 0), config.height - 1)
+        elif config.bounds == "torus":
+            e.x %= config.width
+            e.y %= config.height
+
+    def world_move(e, dx, dy):
+        if config.heading:
+            deg = (2 * e.rotation * 360 + units) // (2 * units) % 360
+            c = round(math.cos(math.radians(deg)) * 1024)
+            s = round(math.sin(math.radians(deg)) * 1024)
+            dx, dy = (dx * c - dy * s) >> 10, (dx * s + dy * c) >> 10
+        move(e, dx, dy)
+        bound(e)
+
+    def world_rotate(e, a):
+        rotate(e, (2 * a * units + 360) // 720)
+        if config.rotation == "wrap":
+            e.rotation %= units
+
+    def world_seek(e, tx, ty):
+        seek(e, tx, ty)
+        bound(e)
+
+    return {**FUNCTIONS, "move": world_move, "rotate": world_rotate, "seek": world_seek}
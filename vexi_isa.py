@@ -0,0 +1,130 @@
+# ============================================================
+# VEXI ISA — FONTE ÚNICA DA TABELA DE OPCODES
+# Opcodes, aridade, faixas de operandos e nomes legíveis
+# Usada pela VVM e pelo validador (Numba), pelo gerador de dataset
+# e pelos prompts
+# ============================================================
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# ----------------------------
+# DEFINIÇÃO
+# ----------------------------
+@dataclass(frozen=True)
+class Operand:
+    name: str   # nome curto usado no prompt (X, Y, V...)
+    lo: int     # faixa válida, inclusiva
+    hi: int
+
+
+@dataclass(frozen=True)
+class Instruction:
+    name: str                   # SET_SHAPE
+    opcode: int                 # 10
+    label: str                  # Shape (nome no prompt)
+    operands: tuple = ()
+    values: dict = field(default_factory=dict)  # {1: ("Circ", "Círculo")}
+
+    @property
+    def arity(self) -> int:
+        return len(self.operands)
+
+
+SHAPES = {1: ("Circ", "Círculo"), 2: ("Sq", "Quadrado"), 3: ("Tri", "Triângulo")}
+COLORS = {1: ("R", "Vermelho"), 2: ("B", "Azul"), 3: ("G", "Verde")}
+
+ISA = (
+    # SPAWN reinicia a entidade (posição, rotação, cor e velocidade padrão)
+    # com a forma do tipo pedido.
+    Instruction("SPAWN", 1, "Spawn", (Operand("T", 1, 3),), SHAPES),
+    Instruction("SET_SHAPE", 10, "Shape", (Operand("S", 1, 3),), SHAPES),
+    Instruction("SET_COLOR", 11, "Color", (Operand("C", 1, 3),), COLORS),
+    Instruction("SET_SPEED", 12, "Speed", (Operand("V", 1, 20),)),
+    Instruction("MOVE", 20, "Move", (Operand("X", 0, 100), Operand("Y", 0, 100))),
+    Instruction("ROTATE", 21, "Rotate", (Operand("D", 0, 360),)),
+    Instruction("SEEK", 30, "Seek", (Operand("X", 0, 100), Operand("Y", 0, 100))),
+    Instruction("CONSUME", 31, "Consume"),
+    # Consultas entre entidades (índice espacial, ver spatial_index.py):
+    # um passo de SEEK rumo à entidade mais próxima da cor C (0 = qualquer)
+    # e consumo da entidade mais próxima dentro do raio R.
+    Instruction("SEEK_NEAREST", 32, "SeekNearest", (Operand("C", 0, 3),), {0: ("Any", "Qualquer"), **COLORS}),
+    Instruction("CONSUME_NEAR", 33, "ConsumeNear", (Operand("R", 0, 100),)),
+)
+
+BY_NAME = {ins.name: ins for ins in ISA}
+BY_OPCODE = {ins.opcode: ins for ins in ISA}
+OPCODES = {ins.name: ins.opcode for ins in ISA}
+ARITY = {ins.opcode: ins.arity for ins in ISA}
+
+# Constantes nomeadas (globais inteiras viram constantes no código Numba)
+SPAWN = OPCODES["SPAWN"]
+SET_SHAPE = OPCODES["SET_SHAPE"]
+SET_COLOR = OPCODES["SET_COLOR"]
+SET_SPEED = OPCODES["SET_SPEED"]
+MOVE = OPCODES["MOVE"]
+ROTATE = OPCODES["ROTATE"]
+SEEK = OPCODES["SEEK"]
+CONSUME = OPCODES["CONSUME"]
+SEEK_NEAREST = OPCODES["SEEK_NEAREST"]
+CONSUME_NEAR = OPCODES["CONSUME_NEAR"]
+
+
+# ----------------------------
+# TABELAS PARA NUMBA
+# ----------------------------
+OPCODE_SPACE = 256
+MAX_ARITY = max(ins.arity for ins in ISA)
+
+
+def build_tables():
+    """
+    Tabelas densas indexadas por opcode: aridade (-1 = opcode inválido) e
+    faixa [lo, hi] de cada operando.
+    """
+    arity = np.full(OPCODE_SPACE, -1, dtype=np.int64)
+    lo = np.zeros((OPCODE_SPACE, MAX_ARITY), dtype=np.int64)
+    hi = np.zeros((OPCODE_SPACE, MAX_ARITY), dtype=np.int64)
+    for ins in ISA:
+        arity[ins.opcode] = ins.arity
+        for k, op in enumerate(ins.operands):
+            lo[ins.opcode, k] = op.lo
+            hi[ins.opcode, k] = op.hi
+    return arity, lo, hi
+
+
+ARITY_TABLE, OPERAND_LO, OPERAND_HI = build_tables()
+
+
+# ----------------------------
+# PROMPTS
+# ----------------------------
+DATASET_SYSTEM_PROMPT = (
+    "You are VexiCompiler. Translate natural language instructions into raw "
+    "integer bytecode sequences separated by spaces. No text, only numbers."
+)
+
+
+def describe(ins: Instruction) -> str:
+    """
+    Linha compacta do prompt: "10:Shape(1:Circ,2:Sq,3:Tri)", "20:Move(X,Y)".
+    """
+    if ins.values:
+        args = ",".join(f"{v}:{abbr}" for v, (abbr, _) in ins.values.items())
+        return f"{ins.opcode}:{ins.label}({args})"
+    if ins.operands:
+        return f"{ins.opcode}:{ins.label}({','.join(op.name for op in ins.operands)})"
+    return f"{ins.opcode}:{ins.label}"
+
+
+def system_rules() -> str:
+    return "\nRole: Bytecode Compiler.\n" + "\n".join(describe(ins) for ins in ISA) + "\n"
+
+
+# ----------------------------
+# PARSING
+# ----------------------------
+def parse_program(text: str) -> np.ndarray:
+    return np.array(text.split(), dtype=np.int64)
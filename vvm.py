@@ -0,0 +1,505 @@
+# ============================================================
+# VVM — Vexi Virtual Machine (Numba + NumPy)
+# Despacho e validação derivados de vexi_isa.py
+# ============================================================
+
+from dataclasses import dataclass, field
+
+import numpy as np
+from numba import njit, prange
+
+from spatial_index import build_grid, nearest
+from vvm_trace import trace_write
+from vexi_isa import (
+    ARITY_TABLE,
+    BY_NAME,
+    CONSUME,
+    CONSUME_NEAR,
+    MOVE,
+    OPCODES,
+    OPERAND_HI,
+    OPERAND_LO,
+    ROTATE,
+    SEEK,
+    SEEK_NEAREST,
+    SET_COLOR,
+    SET_SHAPE,
+    SET_SPEED,
+    SPAWN,
+)
+
+
+# ----------------------------
+# ENTITY STATE
+# ----------------------------
+@dataclass
+class EntityState:
+    x: int = 0
+    y: int = 0
+    rotation: int = 0
+    color: int = 0
+    speed: int = 1
+    shape: int = 1
+
+
+# Layout do state_arr
+X, Y, ROT, COLOR, SPEED, SHAPE = range(6)
+STATE_SIZE = 6
+DEFAULT_STATE = np.array([0, 0, 0, 0, 1, 1], dtype=np.int64)
+
+# Opcodes tratados em execute_instruction; precisa cobrir toda a ISA.
+HANDLED = (SPAWN, SET_SHAPE, SET_COLOR, SET_SPEED, MOVE, ROTATE, SEEK, CONSUME, SEEK_NEAREST, CONSUME_NEAR)
+assert set(HANDLED) == set(OPCODES.values()), "execute_instruction does not cover the ISA"
+
+
+def entity_to_array(entity: EntityState):
+    return np.array([entity.x, entity.y, entity.rotation, entity.color, entity.speed, entity.shape], dtype=np.int64)
+
+
+def array_to_entity(state_arr, entity: EntityState):
+    entity.x, entity.y, entity.rotation, entity.color, entity.speed, entity.shape = state_arr
+
+
+# ----------------------------
+# WORLD — rotação e coordenadas limitadas
+# ----------------------------
+ROT_ACCUMULATE, ROT_WRAP = 0, 1
+BOUNDS_NONE, BOUNDS_CLAMP, BOUNDS_TORUS = 0, 1, 2
+
+# Layout do array `world` recebido pelos kernels
+W_ROT_MODE, W_ANGLE_UNITS, W_BOUNDS, W_WIDTH, W_HEIGHT, W_HEADING, W_CELL = range(7)
+
+# Maior deslocamento de um único MOVE por eixo: operando máximo vezes a
+# velocidade máxima, dobrado porque o heading pode somar dx e dy num eixo.
+MAX_STEP = 2 * BY_NAME["MOVE"].operands[0].hi * BY_NAME["SET_SPEED"].operands[0].hi
+
+# Seno/cosseno em ponto fixo (Q10) por grau: MOVE com heading usa só
+# aritmética inteira, então o resultado é idêntico em qualquer máquina.
+FP_SHIFT = 10
+_DEGREES = np.deg2rad(np.arange(360))
+COS_FP = np.round(np.cos(_DEGREES) * (1 << FP_SHIFT)).astype(np.int64)
+SIN_FP = np.round(np.sin(_DEGREES) * (1 << FP_SHIFT)).astype(np.int64)
+
+
+@dataclass
+class WorldConfig:
+    """
+    rotation:    "accumulate" (soma sem limite, comportamento original) ou
+                 "wrap" (módulo uma volta).
+    angle_units: unidades por volta guardadas em ROT. 360 = graus; valores
+                 como 256 ou 4096 dão ângulos em ponto fixo. ROTATE continua
+                 recebendo graus e converte cada instrução para a unidade
+                 mais próxima (round half up), então o erro é de no máximo
+                 meia unidade por ROTATE; o heading do MOVE converte a
+                 rotação de volta para o grau mais próximo.
+    bounds:      "none", "clamp" (prende em [0, width) x [0, height)) ou
+                 "torus" (dá a volta nas bordas).
+    heading:     MOVE gira (dx, dy) pela rotação atual antes de mover.
+    cell_size:   lado da célula do índice espacial usado por SEEK_NEAREST e
+                 CONSUME_NEAR (ver tick_world).
+    """
+    rotation: str = "accumulate"
+    angle_units: int = 360
+    bounds: str = "none"
+    width: int = 0
+    height: int = 0
+    heading: bool = False
+    cell_size: int = 16
+
+    def to_array(self) -> np.ndarray:
+        if self.bounds != "none" and (self.width <= 0 or self.height <= 0):
+            raise ValueError("Bounded worlds need a positive width and height")
+        world = np.zeros(7, dtype=np.int64)
+        world[W_ROT_MODE] = {"accumulate": ROT_ACCUMULATE, "wrap": ROT_WRAP}[self.rotation]
+        world[W_ANGLE_UNITS] = self.angle_units
+        world[W_BOUNDS] = {"none": BOUNDS_NONE, "clamp": BOUNDS_CLAMP, "torus": BOUNDS_TORUS}[self.bounds]
+        world[W_WIDTH] = self.width
+        world[W_HEIGHT] = self.height
+        world[W_HEADING] = self.heading
+        world[W_CELL] = self.cell_size
+        return world
+
+    def state_dtype(self):
+        """
+        Menor dtype de estado seguro para este mundo: int16 quando
+        coordenadas e rotação são limitadas e cabem, senão int64. Os kernels
+        calculam a nova posição em int64 antes de aplicar os limites; a
+        folga de MAX_STEP é só margem para quem soma sobre o estado fora
+        deles.
+        """
+        if self.bounds == "none" or self.rotation != "wrap":
+            return np.int64
+        limit = max(max(self.width, self.height) + MAX_STEP, self.angle_units)
+        return np.int16 if limit <= np.iinfo(np.int16).max else np.int32
+
+
+UNBOUNDED = WorldConfig().to_array()
+
+
+@njit
+def _bounded(x, y, world):
+    # Recebe e devolve int64: a posição só volta para o estado (que pode ser
+    # int16/int32) depois de presa ou dobrada, então nunca estoura.
+    mode = world[W_BOUNDS]
+    if mode == BOUNDS_CLAMP:
+        x = min(max(x, 0), world[W_WIDTH] - 1)
+        y = min(max(y, 0), world[W_HEIGHT] - 1)
+    elif mode == BOUNDS_TORUS:
+        x = x % world[W_WIDTH]
+        y = y % world[W_HEIGHT]
+    return x, y
+
+
+@njit
+def _store_position(state_arr, x, y, world):
+    x, y = _bounded(x, y, world)
+    state_arr[X] = x
+    state_arr[Y] = y
+
+
+@njit
+def _step_toward(state_arr, tx, ty, world):
+    x, y, speed = np.int64(state_arr[X]), np.int64(state_arr[Y]), np.int64(state_arr[SPEED])
+    if x < tx: x += speed
+    if x > tx: x -= speed
+    if y < ty: y += speed
+    if y > ty: y -= speed
+    _store_position(state_arr, x, y, world)
+
+
+# ----------------------------
+# EXECUÇÃO
+# `env` liga a entidade ao resto do mundo (ver tick_world); sem ele,
+# SEEK_NEAREST e CONSUME_NEAR não têm efeito.
+# ----------------------------
+@njit
+def execute_instruction(state_arr, ip, program, world, env=None, entity=-1):
+    opcode = program[ip]
+    ip += 1
+
+    if opcode == SET_SHAPE:
+        state_arr[SHAPE] = program[ip]
+        ip += 1
+    elif opcode == SET_COLOR:
+        state_arr[COLOR] = program[ip]
+        ip += 1
+    elif opcode == SET_SPEED:
+        state_arr[SPEED] = program[ip]
+        ip += 1
+    elif opcode == MOVE:
+        dx = np.int64(program[ip])
+        dy = np.int64(program[ip+1])
+        speed = np.int64(state_arr[SPEED])
+        if world[W_HEADING]:
+            units = world[W_ANGLE_UNITS]
+            deg = ((np.int64(state_arr[ROT]) * 360 + units // 2) // units) % 360
+            c, s = COS_FP[deg], SIN_FP[deg]
+            dx, dy = (dx * c - dy * s) >> FP_SHIFT, (dx * s + dy * c) >> FP_SHIFT
+        _store_position(state_arr, np.int64(state_arr[X]) + dx * speed,
+                        np.int64(state_arr[Y]) + dy * speed, world)
+        ip += 2
+    elif opcode == ROTATE:
+        units = world[W_ANGLE_UNITS]
+        rot = np.int64(state_arr[ROT]) + (np.int64(program[ip]) * units + 180) // 360
+        if world[W_ROT_MODE] == ROT_WRAP:
+            rot %= units
+        state_arr[ROT] = rot
+        ip += 1
+    elif opcode == SEEK:
+        tx = program[ip]
+        ty = program[ip+1]
+        ip += 2
+        _step_toward(state_arr, tx, ty, world)
+    elif opcode == CONSUME:
+        pass
+    elif opcode == SEEK_NEAREST:
+        if env is not None:
+            start, items, params, xs, ys, colors, alive, intents = env
+            target = nearest(start, items, params, xs, ys, colors, alive,
+                             np.int64(state_arr[X]), np.int64(state_arr[Y]), program[ip], entity, -1)
+            if target >= 0:
+                _step_toward(state_arr, xs[target], ys[target], world)
+        ip += 1
+    elif opcode == CONSUME_NEAR:
+        if env is not None:
+            start, items, params, xs, ys, colors, alive, intents = env
+            radius = np.int64(program[ip])
+            target = nearest(start, items, params, xs, ys, colors, alive,
+                             np.int64(state_arr[X]), np.int64(state_arr[Y]), 0, entity, radius * radius)
+            if target >= 0:
+                intents[entity] = target
+        ip += 1
+    elif opcode == SPAWN:
+        for k in range(STATE_SIZE):
+            state_arr[k] = DEFAULT_STATE[k]
+        state_arr[SHAPE] = program[ip]
+        ip += 1
+    else:
+        raise ValueError(f"Invalid opcode {opcode}")
+
+    return ip
+
+
+@njit
+def run_program(state_arr, program, world=None, env=None, entity=-1, trace=None, tick=0,
+                ip=0, max_steps=None):
+    """
+    Com `trace` (ver vvm_trace.TraceBuffer.arrays) cada instrução grava um
+    registro no ring buffer. Com trace=None o Numba poda esses ramos na
+    compilação: o código gerado é o mesmo de um laço sem trace.
+
+    `ip` e `max_steps` permitem executar o programa em fatias: começa em
+    `ip`, para após `max_steps` instruções e retorna onde parou
+    (len(program) quando terminou). Com max_steps=None não há contagem.
+    """
+    if world is None:
+        world = UNBOUNDED
+    if trace is not None:
+        before = np.empty(STATE_SIZE, dtype=np.int64)
+    steps = 0
+    while ip < len(program):
+        if max_steps is not None:
+            if steps == max_steps:
+                break
+            steps += 1
+        if trace is not None:
+            start_ip = ip
+            for k in range(STATE_SIZE):
+                before[k] = state_arr[k]
+        ip = execute_instruction(state_arr, ip, program, world, env, entity)
+        if trace is not None:
+            trace_write(trace, tick, entity, start_ip, program[start_ip], before, state_arr)
+    return ip
+
+
+@njit
+def _run_entity(state_arr, program, world, env, entity, trace, tick, ip, max_steps):
+    # Sem `ip` o programa roda inteiro a cada tick; com `ip` ele continua de
+    # onde parou no tick anterior e volta ao início quando termina.
+    if ip is None:
+        run_program(state_arr, program, world, env, entity, trace, tick)
+    else:
+        end = run_program(state_arr, program, world, env, entity, trace, tick, ip[entity], max_steps)
+        ip[entity] = 0 if end >= len(program) else end
+
+
+# ----------------------------
+# VALIDAÇÃO
+# ----------------------------
+@njit
+def validate_program(program):
+    """
+    Retorna -1 se o programa é válido, senão a posição do primeiro token
+    inválido: opcode fora da ISA, operando fora da faixa ou instrução
+    truncada.
+    """
+    ip = 0
+    n = len(program)
+    while ip < n:
+        opcode = program[ip]
+        if opcode < 0 or opcode >= len(ARITY_TABLE) or ARITY_TABLE[opcode] < 0:
+            return ip
+        a = ARITY_TABLE[opcode]
+        if ip + a >= n:
+            return ip
+        for k in range(a):
+            v = program[ip + 1 + k]
+            if v < OPERAND_LO[opcode, k] or v > OPERAND_HI[opcode, k]:
+                return ip + 1 + k
+        ip += 1 + a
+    return -1
+
+
+# ----------------------------
+# LOTE: programas empacotados (flat + offsets)
+# Programa i = flat[offsets[i]:offsets[i+1]]
+# ----------------------------
+@njit(parallel=True)
+def validate_batch(flat, offsets):
+    """
+    Valida todos os programas em paralelo. Retorna, por programa, -1 se
+    válido ou a posição (relativa ao início do programa) do primeiro token
+    inválido.
+    """
+    n = len(offsets) - 1
+    errors = np.empty(n, dtype=np.int64)
+    for i in prange(n):
+        errors[i] = validate_program(flat[offsets[i]:offsets[i+1]])
+    return errors
+
+
+@njit(parallel=True)
+def run_batch(states, flat, offsets, mask, world=None, trace=None):
+    """
+    Executa o programa i sobre states[i] para todo i com mask[i] verdadeiro.
+    Programas devem ter sido validados antes (ver validate_batch). Com
+    trace, executa em sequência para manter a ordem dos registros.
+    """
+    if world is None:
+        world = UNBOUNDED
+    n = len(offsets) - 1
+    if trace is None:
+        for i in prange(n):
+            if mask[i]:
+                run_program(states[i], flat[offsets[i]:offsets[i+1]], world)
+    else:
+        for i in range(n):
+            if mask[i]:
+                run_program(states[i], flat[offsets[i]:offsets[i+1]], world, None, i, trace, 0)
+
+
+@njit
+def uses_spatial_index(flat, offsets):
+    """
+    True se algum programa da tabela usa SEEK_NEAREST ou CONSUME_NEAR (ou
+    tem um opcode desconhecido, por segurança). Percorre instrução a
+    instrução, então operandos iguais a esses opcodes não contam.
+    """
+    for p in range(len(offsets) - 1):
+        ip, end = offsets[p], offsets[p + 1]
+        while ip < end:
+            opcode = flat[ip]
+            if opcode < 0 or opcode >= len(ARITY_TABLE) or ARITY_TABLE[opcode] < 0:
+                return True
+            if opcode == SEEK_NEAREST or opcode == CONSUME_NEAR:
+                return True
+            ip += 1 + ARITY_TABLE[opcode]
+    return False
+
+
+@njit
+def _spatial_env(states, alive, world):
+    n = states.shape[0]
+    xs = states[:, X].copy()
+    ys = states[:, Y].copy()
+    colors = states[:, COLOR].copy()
+    start, items, params = build_grid(xs, ys, alive, world[W_CELL])
+    intents = np.full(n, -1, dtype=np.int64)
+    return (start, items, params, xs, ys, colors, alive, intents)
+
+
+@njit(parallel=True)
+def _run_entities(states, alive, flat, offsets, prog_of, world, env, trace, tick, ip, max_steps,
+                  first, count):
+    # Entidades first, first + 1, ..., first + count - 1 (módulo n)
+    n = states.shape[0]
+    if trace is None:
+        for k in prange(count):
+            i = (first + k) % n
+            if alive[i]:
+                p = prog_of[i]
+                _run_entity(states[i], flat[offsets[p]:offsets[p+1]], world, env, i, None, 0, ip, max_steps)
+    else:
+        for k in range(count):
+            i = (first + k) % n
+            if alive[i]:
+                p = prog_of[i]
+                _run_entity(states[i], flat[offsets[p]:offsets[p+1]], world, env, i, trace, tick, ip, max_steps)
+
+
+@njit
+def _apply_consumes(alive, intents):
+    for i in range(len(intents)):
+        t = intents[i]
+        if t >= 0 and alive[i] and alive[t]:
+            alive[t] = False
+
+
+def tick_world(states, alive, flat, offsets, prog_of, world, trace=None, tick=0,
+               ip=None, max_steps=None, spatial=True, first=0, count=None):
+    """
+    Um tick do mundo: cada entidade viva i executa o programa prog_of[i].
+
+    As consultas entre entidades leem uma foto das posições e cores tirada
+    no início do tick, indexada numa grade uniforme reconstruída a cada tick
+    (O(n)), então a ordem de execução não altera o resultado. CONSUME_NEAR
+    só registra a intenção; os consumos são aplicados ao final, em ordem de
+    índice, e uma entidade consumida antes da sua vez não consome ninguém.
+    Com trace, as entidades rodam em sequência.
+
+    Com spatial=False (nenhum programa usa SEEK_NEAREST/CONSUME_NEAR, ver
+    uses_spatial_index) a foto e a grade não são montadas.
+
+    Com `ip` (um por entidade) e `max_steps`, cada entidade executa no máximo
+    `max_steps` instruções neste tick e retoma do mesmo ponto no próximo:
+    é assim que o tick_scheduler mantém o tick dentro do orçamento de tempo.
+
+    Com `count`, só as entidades first, ..., first + count - 1 (módulo n)
+    executam neste tick; as demais esperam a sua vez. Mesmo assim a grade,
+    quando usada, é reconstruída com todas as entidades: esse O(n) por tick
+    é o piso de custo de mundos com consultas espaciais.
+    """
+    n = states.shape[0]
+    count = n if count is None else min(count, n)
+    if not spatial:
+        _run_entities(states, alive, flat, offsets, prog_of, world, None, trace, tick, ip, max_steps,
+                      first, count)
+        return
+    env = _spatial_env(states, alive, world)
+    _run_entities(states, alive, flat, offsets, prog_of, world, env, trace, tick, ip, max_steps,
+                  first, count)
+    _apply_consumes(alive, env[-1])
+
+
+def new_states(n: int, dtype=np.int64) -> np.ndarray:
+    """
+    Estados em colunas compactas: use WorldConfig.state_dtype() para int16/
+    int32 quando o mundo é limitado (metade ou um quarto da banda de memória).
+    """
+    return np.tile(DEFAULT_STATE.astype(dtype), (n, 1))
+
+
+# ----------------------------
+# WORLD — estado completo da simulação
+# ----------------------------
+@dataclass
+class World:
+    states: np.ndarray      # (n, STATE_SIZE)
+    alive: np.ndarray       # (n,) bool
+    prog_of: np.ndarray     # (n,) índice do programa de cada entidade
+    ip: np.ndarray          # (n,) próxima instrução de cada entidade
+    flat: np.ndarray        # tabela de programas empacotada
+    offsets: np.ndarray
+    config: WorldConfig = field(default_factory=WorldConfig)
+    tick: int = 0
+    cursor: int = 0         # primeira entidade do próximo tick com `window`
+    # uses_spatial_index da tabela, recalculado só quando ela cresce
+    _spatial: bool = field(default=True, init=False, repr=False)
+    _spatial_tokens: int = field(default=-1, init=False, repr=False)
+
+    @classmethod
+    def create(cls, n: int, flat, offsets, prog_of=None, config: WorldConfig = None) -> "World":
+        config = config or WorldConfig()
+        return cls(
+            states=new_states(n, config.state_dtype()),
+            alive=np.ones(n, dtype=np.bool_),
+            prog_of=np.zeros(n, dtype=np.int64) if prog_of is None else np.asarray(prog_of, dtype=np.int64),
+            ip=np.zeros(n, dtype=np.int64),
+            flat=np.asarray(flat),
+            offsets=np.asarray(offsets, dtype=np.int64),
+            config=config,
+        )
+
+    def __len__(self):
+        return len(self.states)
+
+    def step(self, trace=None, max_steps=None, window=None):
+        """
+        Sem `max_steps`, todo programa roda inteiro neste tick (self.ip é
+        ignorado). Com `max_steps`, a execução é fatiada entre ticks.
+
+        Com `window`, só `window` entidades executam neste tick, a partir de
+        self.cursor, em rodízio: o custo do tick deixa de crescer com o
+        número total de entidades (exceto a grade espacial, ver tick_world).
+        """
+        if self._spatial_tokens != len(self.flat):
+            self._spatial = uses_spatial_index(self.flat, self.offsets)
+            self._spatial_tokens = len(self.flat)
+        n = len(self)
+        count = n if window is None else min(int(window), n)
+        ip, steps = (None, None) if max_steps is None else (self.ip, np.int64(max_steps))
+        tick_world(self.states, self.alive, self.flat, self.offsets, self.prog_of,
+                   self.config.to_array(), trace, self.tick, ip, steps, self._spatial,
+                   self.cursor, count)
+        self.cursor = (self.cursor + count) % n if n else 0
+        self.tick += 1
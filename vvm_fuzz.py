@@ -0,0 +1,483 @@
+# ============================================================
+# VVM FUZZ — TESTE DIFERENCIAL VVM x TRADITIONAL_CODE
+# Programas aleatórios com a mesma mistura de ações do gerar_codigo_vexi.py
+# Cada programa é transpilado para o Python do TRADITIONAL_CODE
+# Mundos limitados (clamp/torus, estado int16/int32, heading) e consultas
+# espaciais contra world_functions e uma busca por força bruta
+# Estados finais comparados em bloco; contraexemplos minimizados
+# ============================================================
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gerar_codigo_vexi import ACTION_INSTRUCTIONS, ACTIONS, MAX_STEPS, MIN_STEPS, ROTATE_ANGLES
+from traditional import FUNCTIONS as REFERENCE_FUNCTIONS, world_functions
+from vexi_isa import (ARITY, ARITY_TABLE, BY_NAME, BY_OPCODE, CONSUME_NEAR, MAX_ARITY, OPCODES, OPERAND_HI,
+                      OPERAND_LO, ROTATE, SEEK_NEAREST, SPAWN)
+from vvm import STATE_SIZE, EntityState, World, WorldConfig, new_states, run_batch, validate_batch
+
+# ----------------------------
+# SEMÂNTICA DE REFERÊNCIA
+# As funções do TRADITIONAL_CODE vêm de traditional.py, o mesmo módulo
+# usado pelos benchmarks; nos mundos limitados, de world_functions.
+# ----------------------------
+WORLDS = {
+    # Bordas alcançadas a todo momento, ângulos em 256 unidades
+    "clamp": WorldConfig(rotation="wrap", angle_units=256, bounds="clamp", width=500, height=500, heading=True),
+    # Estado int16 com a borda a menos de um MOVE do limite do int16
+    "torus": WorldConfig(rotation="wrap", bounds="torus", width=32000, height=32000, heading=True),
+    "torus_fixed": WorldConfig(rotation="wrap", angle_units=4096, bounds="torus",
+                               width=100_000, height=100_000, heading=True),
+    # SEEK_NEAREST / CONSUME_NEAR em mundos de SPATIAL_GROUP entidades
+    "spatial": WorldConfig(rotation="wrap", bounds="clamp", width=256, height=256, cell_size=16),
+}
+SPATIAL_GROUP = 64
+
+# Nome da função de referência de cada opcode
+FUNCTIONS = {opcode: ins.name.lower() for opcode, ins in BY_OPCODE.items()}
+
+
+def transpile(program, entity: str = "entity") -> str:
+    """
+    Bytecode -> chamadas no estilo do TRADITIONAL_CODE, uma por linha.
+    """
+    program = [int(v) for v in program]
+    lines = []
+    ip = 0
+    while ip < len(program):
+        opcode = program[ip]
+        args = [entity] + [str(v) for v in program[ip + 1:ip + 1 + ARITY[opcode]]]
+        lines.append(f"{FUNCTIONS[opcode]}({', '.join(args)})")
+        ip += 1 + ARITY[opcode]
+    return "\n".join(lines)
+
+
+def split_instructions(program) -> list:
+    program = [int(v) for v in program]
+    out, ip = [], 0
+    while ip < len(program):
+        step = 1 + ARITY[program[ip]]
+        out.append(program[ip:ip + step])
+        ip += step
+    return out
+
+
+def pack(programs):
+    """
+    Lista de programas -> (flat int32, offsets int64).
+    """
+    lengths = [len(p) for p in programs]
+    flat = np.array([v for p in programs for v in p], dtype=np.int32)
+    return flat, np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+
+
+_NAMESPACES = {}
+# (mundo, linha transpilada) -> função compilada (a mistura de ações tem
+# poucas dezenas de milhares de instruções distintas, então o cache satura
+# rápido)
+_LINES = {}
+
+
+def _namespace(world: str = None) -> dict:
+    ns = _NAMESPACES.get(world)
+    if ns is None:
+        ns = dict(REFERENCE_FUNCTIONS if world is None else world_functions(WORLDS[world]))
+        _NAMESPACES[world] = ns
+    return ns
+
+
+def _compiled(instruction: tuple, world: str = None):
+    fn = _LINES.get((world, instruction))
+    if fn is None:
+        fn = eval(compile(f"lambda e: {transpile(instruction, 'e')}", "<traditional>", "eval"), _namespace(world))
+        _LINES[(world, instruction)] = fn
+    return fn
+
+
+def _entity(states, i) -> EntityState:
+    return EntityState() if states is None else EntityState(*states[i])
+
+
+def run_reference(flat, offsets, world: str = None, states=None) -> np.ndarray:
+    """
+    Executa cada programa como o Python do TRADITIONAL_CODE, linha a linha,
+    a partir de states[i] (padrão: EntityState()). Cada instrução distinta é
+    transpilada e compilada uma única vez: compilar o programa inteiro
+    custaria ~10 µs por linha, mais que executá-lo.
+    """
+    tokens, offs = flat.tolist(), offsets.tolist()
+    states = None if states is None else states.tolist()
+    n = len(offs) - 1
+    out = np.empty((n, STATE_SIZE), dtype=np.int64)
+    rows = []
+    for i in range(n):
+        e = _entity(states, i)
+        ip, end = offs[i], offs[i+1]
+        while ip < end:
+            step = 1 + ARITY[tokens[ip]]
+            _compiled(tuple(tokens[ip:ip + step]), world)(e)
+            ip += step
+        rows.append((e.x, e.y, e.rotation, e.color, e.speed, e.shape))
+    if rows:
+        out[:] = rows
+    return out
+
+
+def _nearest(i, x, y, xs, ys, colors, alive, color, max_dist2):
+    # Força bruta: menor distância², empate pelo menor índice
+    best, best_d2 = -1, -1
+    for j in range(len(xs)):
+        if j == i or not alive[j] or (color != 0 and colors[j] != color):
+            continue
+        d2 = (xs[j] - x) ** 2 + (ys[j] - y) ** 2
+        if max_dist2 >= 0 and d2 > max_dist2:
+            continue
+        if best < 0 or d2 < best_d2:
+            best, best_d2 = j, d2
+    return best
+
+
+def run_reference_spatial(flat, offsets, states, world: str = "spatial", group: int = SPATIAL_GROUP) -> np.ndarray:
+    """
+    Um tick de cada mundo de `group` entidades consecutivas, como descrito
+    em vvm.tick_world: consultas sobre a foto do início do tick, consumos
+    aplicados no fim em ordem de índice. Retorna estados + coluna alive.
+    """
+    tokens, offs, rows_in = flat.tolist(), offsets.tolist(), states.tolist()
+    seek = _namespace(world)["seek"]
+    n = len(offs) - 1
+    out = np.empty((n, STATE_SIZE + 1), dtype=np.int64)
+    for a in range(0, n, group):
+        b = min(a + group, n)
+        xs = [rows_in[i][0] for i in range(a, b)]
+        ys = [rows_in[i][1] for i in range(a, b)]
+        colors = [rows_in[i][3] for i in range(a, b)]
+        alive = [True] * (b - a)
+        intents = [-1] * (b - a)
+        for i in range(a, b):
+            e = _entity(rows_in, i)
+            ip, end = offs[i], offs[i+1]
+            while ip < end:
+                opcode = tokens[ip]
+                if opcode == SEEK_NEAREST:
+                    t = _nearest(i - a, e.x, e.y, xs, ys, colors, alive, tokens[ip + 1], -1)
+                    if t >= 0:
+                        seek(e, xs[t], ys[t])
+                elif opcode == CONSUME_NEAR:
+                    t = _nearest(i - a, e.x, e.y, xs, ys, colors, alive, 0, tokens[ip + 1] ** 2)
+                    if t >= 0:
+                        intents[i - a] = t
+                else:
+                    _compiled(tuple(tokens[ip:ip + 1 + ARITY[opcode]]), world)(e)
+                ip += 1 + ARITY[opcode]
+            out[i, :STATE_SIZE] = (e.x, e.y, e.rotation, e.color, e.speed, e.shape)
+        for i, t in enumerate(intents):
+            if t >= 0 and alive[i] and alive[t]:
+                alive[t] = False
+        out[a:b, STATE_SIZE] = alive
+    return out
+
+
+def reference(key, flat, offsets, states=None) -> np.ndarray:
+    """
+    Referência de um caminho: key None = mundo sem limites a partir do
+    estado padrão; nome de WORLDS = aquele mundo a partir de `states`.
+    """
+    if key is None:
+        return run_reference(flat, offsets)
+    if key == "spatial":
+        return run_reference_spatial(flat, offsets, states)
+    return run_reference(flat, offsets, key, states)
+
+
+# ----------------------------
+# CAMINHOS DA VVM SOB TESTE
+# ----------------------------
+def vvm_batch(flat, offsets, dtype=np.int64, world: str = None, states=None):
+    n = len(offsets) - 1
+    states = new_states(n, dtype) if states is None else states.astype(dtype)
+    run_batch(states, flat, offsets, np.ones(n, dtype=np.bool_),
+              None if world is None else WORLDS[world].to_array())
+    return states.astype(np.int64)
+
+
+def vvm_tick(flat, offsets):
+    world = World.create(len(offsets) - 1, flat, offsets, prog_of=np.arange(len(offsets) - 1))
+    world.step()
+    return world.states.astype(np.int64)
+
+
+def vvm_spatial(flat, offsets, states, group: int = SPATIAL_GROUP):
+    n = len(offsets) - 1
+    out = np.empty((n, STATE_SIZE + 1), dtype=np.int64)
+    for a in range(0, n, group):
+        b = min(a + group, n)
+        world = World.create(b - a, flat[offsets[a]:offsets[b]], offsets[a:b + 1] - offsets[a],
+                             prog_of=np.arange(b - a), config=WORLDS["spatial"])
+        world.states[:] = states[a:b]
+        world.step()
+        out[a:b, :STATE_SIZE] = world.states
+        out[a:b, STATE_SIZE] = world.alive
+    return out
+
+
+# Caminho -> (chave da referência, execução(flat, offsets, states)). Os
+# caminhos com mundo rodam programas com a ISA inteira a partir de estados
+# aleatórios dentro do mundo.
+PATHS = {
+    "batch": (None, lambda flat, offsets, states: vvm_batch(flat, offsets)),
+    "batch_int32": (None, lambda flat, offsets, states: vvm_batch(flat, offsets, np.int32)),
+    "tick": (None, lambda flat, offsets, states: vvm_tick(flat, offsets)),
+    "clamp_int16": ("clamp", lambda flat, offsets, states: vvm_batch(flat, offsets, np.int16, "clamp", states)),
+    # int16 de propósito (state_dtype escolheria int32): a posição só pode
+    # voltar ao estado depois de dobrada
+    "torus_int16": ("torus", lambda flat, offsets, states: vvm_batch(flat, offsets, np.int16, "torus", states)),
+    "torus_int32": ("torus_fixed",
+                    lambda flat, offsets, states: vvm_batch(flat, offsets, np.int32, "torus_fixed", states)),
+    "spatial": ("spatial", vvm_spatial),
+}
+
+
+# ----------------------------
+# GERADOR
+# ----------------------------
+def random_programs(n: int, seed: int, full_isa: bool = False):
+    """
+    `n` programas com a distribuição de generate_sample: SPAWN seguido de
+    MIN_STEPS..MAX_STEPS ações sorteadas de ACTIONS, operandos uniformes na
+    faixa da ISA (ROTATE só com ROTATE_ANGLES). Com full_isa, as ações são
+    todas as instruções da ISA (SPAWN e consultas espaciais inclusive), sem
+    SPAWN forçado no início e com qualquer ângulo. Vetorizado: milhões de
+    programas em segundos.
+    """
+    rng = np.random.default_rng(seed)
+    if full_isa:
+        action_ops = np.array(sorted(OPCODES.values()), dtype=np.int64)
+    else:
+        action_ops = np.array([OPCODES[ACTION_INSTRUCTIONS[a]] for a in ACTIONS], dtype=np.int64)
+
+    steps = rng.integers(MIN_STEPS, MAX_STEPS + 1, n)
+    per_program = steps + 1
+    first = np.concatenate(([0], np.cumsum(per_program)[:-1]))
+
+    ops = action_ops[rng.integers(0, len(action_ops), int(per_program.sum()))]
+    if not full_isa:
+        ops[first] = SPAWN
+
+    arity = ARITY_TABLE[ops]
+    sizes = 1 + arity
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    flat = np.empty(int(sizes.sum()), dtype=np.int32)
+    flat[starts] = ops
+    for k in range(MAX_ARITY):
+        sel = arity > k
+        lo, hi = OPERAND_LO[ops[sel], k], OPERAND_HI[ops[sel], k]
+        flat[starts[sel] + 1 + k] = rng.integers(lo, hi + 1)
+    if not full_isa:
+        rot = ops == ROTATE
+        flat[starts[rot] + 1] = rng.choice(ROTATE_ANGLES, int(rot.sum()))
+
+    offsets = np.concatenate(([0], np.cumsum(np.add.reduceat(sizes, first)))).astype(np.int64)
+    return flat, offsets
+
+
+def random_states(n: int, config: WorldConfig, seed: int) -> np.ndarray:
+    """
+    Estados iniciais aleatórios dentro do mundo `config`.
+    """
+    rng = np.random.default_rng(seed)
+    states = np.empty((n, STATE_SIZE), dtype=np.int64)
+    states[:, 0] = rng.integers(0, config.width, n)
+    states[:, 1] = rng.integers(0, config.height, n)
+    states[:, 2] = rng.integers(0, config.angle_units, n)
+    states[:, 3] = rng.integers(0, BY_NAME["SET_COLOR"].operands[0].hi + 1, n)
+    states[:, 4] = rng.integers(BY_NAME["SET_SPEED"].operands[0].lo, BY_NAME["SET_SPEED"].operands[0].hi + 1, n)
+    states[:, 5] = rng.integers(BY_NAME["SET_SHAPE"].operands[0].lo, BY_NAME["SET_SHAPE"].operands[0].hi + 1, n)
+    return states
+
+
+def _reference_chunk(args):
+    return reference(*args)
+
+
+# ----------------------------
+# MINIMIZAÇÃO
+# ----------------------------
+def run_path(path: str, program, state=None):
+    """
+    (referência, VVM) de um único programa no caminho `path`.
+    """
+    key, run = PATHS[path]
+    flat, offsets = pack([program])
+    states = None if state is None else np.array([state], dtype=np.int64)
+    return reference(key, flat, offsets, states), run(flat, offsets, states)
+
+
+def mismatches(program, path, state=None) -> bool:
+    expected, got = run_path(path, program, state)
+    return not np.array_equal(expected, got)
+
+
+def minimize(program, path: str, state=None) -> list:
+    """
+    Menor programa (por remoção de instruções e redução de operandos) que
+    ainda diverge da referência no caminho `path`, a partir de `state`.
+    """
+    instructions = split_instructions(program)
+    flatten = lambda ins: [v for i in ins for v in i]
+
+    # Remove blocos de instruções, do maior ao menor (delta debugging)
+    size = max(len(instructions) // 2, 1)
+    while size >= 1:
+        i, removed = 0, False
+        while i < len(instructions):
+            candidate = instructions[:i] + instructions[i + size:]
+            if candidate and mismatches(flatten(candidate), path, state):
+                instructions, removed = candidate, True
+            else:
+                i += size
+        if not removed:
+            size //= 2
+
+    # Aproxima cada operando do limite inferior da faixa
+    for ins in instructions:
+        for k in range(1, len(ins)):
+            lo = int(OPERAND_LO[ins[0], k - 1])
+            shrunk = True
+            while shrunk and ins[k] > lo:
+                shrunk, original = False, ins[k]
+                for value in (lo, lo + (original - lo) // 2, original - 1):
+                    ins[k] = value
+                    if mismatches(flatten(instructions), path, state):
+                        shrunk = True
+                        break
+                if not shrunk:
+                    ins[k] = original
+    return flatten(instructions)
+
+
+# ----------------------------
+# HARNESS
+# ----------------------------
+def _split(size: int, parts: int, group: int = SPATIAL_GROUP):
+    # Fronteiras dos blocos da referência, alinhadas aos mundos espaciais
+    bounds = np.linspace(0, size, parts + 1).astype(np.int64) // group * group
+    bounds[-1] = size
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def fuzz(n: int, seed: int = 0, chunk: int = 50_000, workers: int = None, paths=tuple(PATHS)):
+    """
+    Gera `n` programas em blocos de `chunk` e compara cada caminho da VVM
+    com a referência. Retorna ({caminho: [(programa, estado inicial)]},
+    tempos). A referência (Python puro) roda em `workers` processos, uma vez
+    por chave de referência.
+    """
+    timings = {"jit": 0.0, "generate": 0.0, "reference": 0.0}
+    timings.update({p: 0.0 for p in paths})
+    failures = {p: [] for p in paths}
+    keys = list(dict.fromkeys(PATHS[p][0] for p in paths))
+
+    def inputs(size, c):
+        base = random_programs(size, seed + c) if None in keys else None
+        full = random_programs(size, seed + c, full_isa=True) if any(k is not None for k in keys) else None
+        states = {k: random_states(size, WORLDS[k], seed + c) for k in keys if k is not None}
+        return base, full, states
+
+    # Compila os kernels fora da medição dos caminhos
+    t0 = time.perf_counter()
+    base, full, states = inputs(1, 0)
+    for p in paths:
+        key, run = PATHS[p]
+        flat, offsets = base if key is None else full
+        validate_batch(flat, offsets)
+        run(flat, offsets, states.get(key))
+    timings["jit"] = time.perf_counter() - t0
+
+    workers = workers or os.cpu_count() or 1
+    # spawn: fork depois das threads do Numba pode travar os processos
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for c, start in enumerate(range(0, n, chunk)):
+            size = min(chunk, n - start)
+            t0 = time.perf_counter()
+            base, full, states = inputs(size, c)
+            for programs in (base, full):
+                if programs is not None and (validate_batch(*programs) >= 0).any():
+                    raise RuntimeError("Generator produced invalid bytecode")
+            timings["generate"] += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            expected = {}
+            for key in keys:
+                flat, offsets = base if key is None else full
+                s = states.get(key)
+                if pool is None:
+                    expected[key] = reference(key, flat, offsets, s)
+                else:
+                    jobs = [(key, flat[offsets[a]:offsets[b]], offsets[a:b + 1] - offsets[a],
+                             None if s is None else s[a:b]) for a, b in _split(size, workers)]
+                    expected[key] = np.concatenate(list(pool.map(_reference_chunk, jobs)))
+            timings["reference"] += time.perf_counter() - t0
+
+            for p in paths:
+                key, run = PATHS[p]
+                flat, offsets = base if key is None else full
+                s = states.get(key)
+                t0 = time.perf_counter()
+                got = run(flat, offsets, s)
+                timings[p] += time.perf_counter() - t0
+                bad = np.flatnonzero((got != expected[key]).any(axis=1))
+                failures[p].extend((flat[offsets[i]:offsets[i+1]].tolist(), None if s is None else s[i].tolist())
+                                   for i in bad)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return failures, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste diferencial da VVM contra a semântica do TRADITIONAL_CODE.")
+    parser.add_argument("-n", "--programs", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=None, help="processos da referência (padrão: CPUs)")
+    parser.add_argument("--paths", nargs="*", default=list(PATHS), choices=list(PATHS))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    failures, timings = fuzz(args.programs, args.seed, args.chunk, args.workers, args.paths)
+    elapsed = time.perf_counter() - start
+
+    print(f"Programas: {args.programs:,} | Seed: {args.seed} | Total: {elapsed:.2f}s "
+          f"({args.programs / elapsed:,.0f} programas/s)")
+    print(" | ".join(f"{name}: {t:.2f}s" for name, t in timings.items()))
+
+    failed = False
+    for path, found in failures.items():
+        print(f"{path}: {len(found)} divergências")
+        if not found:
+            continue
+        failed = True
+        program, state = min(found, key=lambda f: len(f[0]))
+        if PATHS[path][0] == "spatial":
+            # Depende das outras entidades do mundo: sem minimização isolada
+            print(f"  Contraexemplo: {' '.join(map(str, program))} (estado inicial {state})")
+            continue
+        smallest = minimize(program, path, state)
+        expected, got = run_path(path, smallest, state)
+        print(f"  Contraexemplo mínimo: {' '.join(map(str, smallest))}"
+              + (f" (estado inicial {state})" if state is not None else ""))
+        print("  " + transpile(smallest).replace("\n", "\n  "))
+        print(f"  Referência: {expected[0].tolist()}")
+        print(f"  VVM:        {got[0].tolist()}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,172 @@
+# ============================================================
+# VVM TRACE — RING BUFFER DE EVENTOS
+# Registro (tick, entidade, ip, opcode, delta do estado) por instrução,
+# escrito de dentro do kernel Numba, exportado em binário compacto
+# Replay reconstrói o estado de uma entidade em qualquer tick
+# ============================================================
+
+import time
+
+import numpy as np
+from numba import njit
+
+# Colunas de um registro (int32). Os deltas seguem a ordem do state_arr
+# da VVM: x, y, rotation, color, speed, shape.
+T_TICK, T_ENTITY, T_IP, T_OPCODE = range(4)
+T_DELTA = 4
+STATE_FIELDS = 6
+TRACE_COLS = T_DELTA + STATE_FIELDS
+
+MAGIC = b"VXTR"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("cols", "<u4"),
+    ("capacity", "<u8"),
+    ("total", "<u8"),
+])
+VERSION = 1
+
+
+@njit
+def trace_write(trace, tick, entity, ip, opcode, before, after):
+    """
+    Grava um registro no ring buffer. `trace` = (records, head), onde
+    head[0] conta todos os registros já escritos (inclusive sobrescritos).
+    """
+    records, head = trace
+    slot = head[0] % records.shape[0]
+    records[slot, T_TICK] = tick
+    records[slot, T_ENTITY] = entity
+    records[slot, T_IP] = ip
+    records[slot, T_OPCODE] = opcode
+    for k in range(STATE_FIELDS):
+        records[slot, T_DELTA + k] = after[k] - before[k]
+    head[0] += 1
+
+
+# ----------------------------
+# BUFFER
+# ----------------------------
+class TraceBuffer:
+    """
+    Buffer pré-alocado de `capacity` registros. Passe `buffer.arrays` como
+    argumento `trace` de run_program / run_batch / tick_world. Com trace
+    ativo, os kernels paralelos rodam em sequência para que a ordem dos
+    registros seja determinística.
+    """
+
+    def __init__(self, capacity: int = 1 << 20):
+        self.records = np.zeros((capacity, TRACE_COLS), dtype=np.int32)
+        self.head = np.zeros(1, dtype=np.int64)
+
+    @property
+    def arrays(self):
+        return (self.records, self.head)
+
+    @property
+    def total(self) -> int:
+        return int(self.head[0])
+
+    @property
+    def dropped(self) -> int:
+        return max(self.total - len(self.records), 0)
+
+    def ordered(self) -> np.ndarray:
+        """
+        Registros retidos, do mais antigo ao mais novo.
+        """
+        capacity = len(self.records)
+        if self.total <= capacity:
+            return self.records[:self.total]
+        slot = self.total % capacity
+        return np.concatenate((self.records[slot:], self.records[:slot]))
+
+    def clear(self):
+        self.head[0] = 0
+
+    def save(self, path: str):
+        records = self.ordered()
+        header = np.array([(MAGIC, VERSION, TRACE_COLS, len(self.records), self.total)], dtype=HEADER_DTYPE)
+        with open(path, "wb") as f:
+            header.tofile(f)
+            np.ascontiguousarray(records).tofile(f)
+
+
+def load_trace(path: str):
+    """
+    Retorna (registros do mais antigo ao mais novo, registros perdidos).
+    """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+    if header["magic"] != MAGIC or header["cols"] != TRACE_COLS:
+        raise ValueError(f"{path} is not a VVM trace (version {VERSION})")
+    records = np.fromfile(path, dtype=np.int32, offset=HEADER_DTYPE.itemsize).reshape(-1, TRACE_COLS)
+    dropped = int(header["total"]) - len(records)
+    return records, dropped
+
+
+# ----------------------------
+# REPLAY
+# ----------------------------
+def replay_entity(records, base_state, entity: int, tick: int) -> np.ndarray:
+    """
+    Estado da entidade ao final do `tick`, aplicando em ordem os deltas dos
+    registros dela sobre `base_state`. `base_state` deve ser o estado da
+    entidade antes do registro mais antigo retido (se o buffer deu a volta,
+    use um snapshot desse ponto).
+    """
+    mine = records[(records[:, T_ENTITY] == entity) & (records[:, T_TICK] <= tick)]
+    return np.asarray(base_state, dtype=np.int64) + mine[:, T_DELTA:].sum(axis=0, dtype=np.int64)
+
+
+def entity_history(records, entity: int) -> np.ndarray:
+    """
+    Registros de uma entidade, na ordem em que foram executados.
+    """
+    return records[records[:, T_ENTITY] == entity]
+
+
+# ----------------------------
+# BENCHMARK — custo do trace desligado
+# ----------------------------
+if __name__ == "__main__":
+    from dataset_tools import load_corpus
+    from vvm import execute_instruction, new_states, run_batch, UNBOUNDED
+    from numba import prange
+
+    @njit(parallel=True)
+    def run_batch_reference(states, flat, offsets, world):
+        # Laço da VVM sem nenhum código de trace, para comparação.
+        for i in prange(len(offsets) - 1):
+            program = flat[offsets[i]:offsets[i+1]]
+            ip = 0
+            while ip < len(program):
+                ip = execute_instruction(states[i], ip, program, world)
+
+    flat, offsets = load_corpus("dataset.jsonl")
+    lengths = np.diff(offsets)
+    REPEAT = 2000
+    flat = np.tile(flat, REPEAT)
+    offsets = np.concatenate(([0], np.cumsum(np.tile(lengths, REPEAT))))
+    n = len(offsets) - 1
+    mask = np.ones(n, dtype=np.bool_)
+    ROUNDS = 7
+
+    def best_of(fn):
+        fn()  # compila
+        times = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    t_ref = best_of(lambda: run_batch_reference(new_states(n), flat, offsets, UNBOUNDED))
+    t_off = best_of(lambda: run_batch(new_states(n), flat, offsets, mask, UNBOUNDED))
+    buffer = TraceBuffer(1 << 22)
+    t_on = best_of(lambda: run_batch(new_states(n), flat, offsets, mask, UNBOUNDED, buffer.arrays))
+
+    print(f"Programas: {n:,} | Melhor de {ROUNDS}")
+    print(f"Sem código de trace: {t_ref:.4f}s")
+    print(f"Trace desligado:     {t_off:.4f}s ({(t_off / t_ref - 1) * 100:+.1f}%)")
+    print(f"Trace ligado:        {t_on:.4f}s ({(t_on / t_ref - 1) * 100:+.1f}%, sequencial)")